@@ -0,0 +1,157 @@
+import math
+import random
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+_MISSING = object()
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+AVOIDED = ('coalesced', 'stale')
+
+
+class Uncacheable(Exception):
+    """Поднимается из compute, чтобы вернуть значение, не кэшируя его."""
+
+    def __init__(self, value):
+        super().__init__(value)
+        self.value = value
+
+
+def _count(event):
+    with _stats_lock:
+        _stats[event] += 1
+
+
+def stats():
+    """Счётчики кэша в этом процессе.
+
+    avoided — сколько пересчётов не понадобилось, потому что запись
+    уже пересчитывал другой запрос.
+    """
+    with _stats_lock:
+        counts = dict(_stats)
+    counts['avoided'] = sum(counts.get(event, 0) for event in AVOIDED)
+    return counts
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def lock_key(key):
+    return f'{key}:lock'
+
+
+def peek(key):
+    """Значение записи без пересчёта, даже устаревшее."""
+    entry = cache.get(key)
+    return None if entry is None else entry[0]
+
+
+def put(key, value, timeout, delta=0.0, stale=None):
+    """Сохраняет значение вместе со сроком свежести.
+
+    Запись живёт в кэше ещё stale секунд после этого срока, чтобы её
+    можно было отдавать, пока один запрос считает новое значение.
+    """
+    if stale is None:
+        stale = settings.CACHE_STALE_TIMEOUT
+    if timeout is None:
+        cache.set(key, (value, math.inf, delta), None)
+    else:
+        cache.set(key, (value, time.time() + timeout, delta), timeout + stale)
+
+
+def update(key, change, timeout):
+    """Меняет значение записи на change(значение) под тем же замком,
+    что и пересчёт в get_or_compute, поэтому одновременные изменения
+    не теряют друг друга. Отсутствующая запись не создаётся.
+
+    Если замок не освободился за CACHE_LOCK_WAIT секунд, запись
+    удаляется, и следующий запрос посчитает её заново.
+    """
+    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+    while not cache.add(lock_key(key), 1, settings.CACHE_LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            cache.delete(key)
+            return
+        time.sleep(0.01)
+    try:
+        value = peek(key)
+        if value is not None:
+            put(key, change(value), timeout)
+    finally:
+        cache.delete(lock_key(key))
+
+
+def _refresh_due(expires, delta):
+    # Вероятностный досрочный пересчёт: чем дольше считается значение
+    # и чем ближе срок, тем вероятнее, что запрос пересчитает его сам.
+    jitter = -delta * settings.CACHE_EARLY_BETA * math.log(
+        1 - random.random()
+    )
+    return time.time() + jitter >= expires
+
+
+def _recompute(key, compute, timeout, stale):
+    started = time.monotonic()
+    try:
+        value = compute()
+    except Uncacheable as uncacheable:
+        return uncacheable.value
+    finally:
+        cache.delete(lock_key(key))
+    put(key, value, timeout, time.monotonic() - started, stale)
+    return value
+
+
+def _wait(key, valid):
+    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.01)
+        found = cache.get_many([key, lock_key(key)])
+        entry = found.get(key)
+        if entry is not None and (valid is None or valid(entry[0])):
+            return entry[0]
+        if lock_key(key) not in found:
+            break
+    return _MISSING
+
+
+def get_or_compute(key, compute, timeout, stale=None, valid=None,
+                   cached=_MISSING):
+    """Значение из кэша или compute(), посчитанное одним запросом.
+
+    Пока один запрос пересчитывает запись, остальные отдают устаревшее
+    значение, а если его нет — ждут результат. valid(value) отбраковывает
+    значения, которые нельзя считать свежими; cached — запись, уже
+    прочитанная из кэша вместе с другими ключами.
+    """
+    if cached is _MISSING:
+        cached = cache.get(key)
+    if cached is not None:
+        value, expires, delta = cached
+        fresh = valid is None or valid(value)
+        if fresh and not _refresh_due(expires, delta):
+            _count('hit')
+            return value
+        expired = not fresh or time.time() >= expires
+        if not cache.add(lock_key(key), 1, settings.CACHE_LOCK_TIMEOUT):
+            _count('stale' if expired else 'hit')
+            return value
+        _count('recompute' if expired else 'early')
+        return _recompute(key, compute, timeout, stale)
+    if not cache.add(lock_key(key), 1, settings.CACHE_LOCK_TIMEOUT):
+        value = _wait(key, valid)
+        if value is not _MISSING:
+            _count('coalesced')
+            return value
+    _count('miss')
+    return _recompute(key, compute, timeout, stale)
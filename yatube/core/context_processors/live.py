@@ -0,0 +1,7 @@
+from django.conf import settings
+
+
+def live(request):
+    return {
+        'live_events_url': settings.LIVE_EVENTS_URL,
+    }
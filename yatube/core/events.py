@@ -0,0 +1,254 @@
+import json
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict, deque, namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import StreamingHttpResponse
+
+Event = namedtuple('Event', 'id channel name data')
+
+SEQUENCE_KEY = 'events:sequence'
+
+logger = logging.getLogger(__name__)
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def event_key(event_id):
+    return f'events:{event_id}'
+
+
+class Subscription:
+    """Очередь событий одного клиента.
+
+    Если клиент не успевает читать и очередь переполнена, подписка
+    помечается отставшей: клиенту проще переподключиться и
+    перечитать страницу, чем получать события с пропусками.
+    """
+
+    def __init__(self, broker, channels, maxsize):
+        self.broker = broker
+        self.channels = channels
+        self.lagging = False
+        self._queue = queue.Queue(maxsize)
+
+    def put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.lagging = True
+
+    def get(self, timeout):
+        """Следующее событие или None, если за timeout его не было."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    """Публикация событий по каналам для подписчиков этого процесса.
+
+    Последние EVENTS_HISTORY событий хранятся, чтобы переподключённый
+    клиент получил пропущенное после Last-Event-ID.
+    """
+
+    def __init__(self, history, queue_size):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+        self._recent = deque(maxlen=history)
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels, last_id=None):
+        subscription = Subscription(self, channels, self.queue_size)
+        with self._lock:
+            for channel in channels:
+                self._subscribers[channel].add(subscription)
+            if last_id is not None:
+                for event in self._recent:
+                    if event.id > last_id and event.channel in channels:
+                        subscription.put(event)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+    def _dispatch(self, make_event):
+        with self._lock:
+            event = make_event()
+            if event is None:
+                return
+            self._last_id = event.id
+            self._recent.append(event)
+            subscribers = list(self._subscribers.get(event.channel, ()))
+        for subscription in subscribers:
+            subscription.put(event)
+
+    def deliver(self, event):
+        """Раздаёт событие с уже присвоенным номером, если оно новое."""
+        self._dispatch(lambda: event if event.id > self._last_id else None)
+
+    def publish(self, channel, name, data):
+        self._dispatch(
+            lambda: Event(self._last_id + 1, channel, name, data)
+        )
+
+
+class CacheBroker(Broker):
+    """Broker, который рассылает события всем процессам через общий кэш.
+
+    publish() дописывает событие в журнал в кэше под следующим номером,
+    а поток каждого процесса раз в EVENTS_RELAY_INTERVAL секунд
+    забирает новые записи и раздаёт их своим подписчикам. Если кэш
+    недоступен, событие получают только подписчики этого процесса.
+    """
+
+    def __init__(self, history, queue_size, interval, log_timeout, grace):
+        super().__init__(history, queue_size)
+        self.interval = interval
+        self.log_timeout = log_timeout
+        self.grace = grace
+        self._relay = None
+        self._missing = {}
+
+    def subscribe(self, channels, last_id=None):
+        if self._relay is None:
+            with self._lock:
+                if self._relay is None:
+                    self._last_id = cache.get(SEQUENCE_KEY, 0)
+                    self._relay = threading.Thread(
+                        target=self._run_relay, daemon=True
+                    )
+                    self._relay.start()
+        return super().subscribe(channels, last_id)
+
+    def publish(self, channel, name, data):
+        try:
+            cache.add(SEQUENCE_KEY, 0, None)
+            event_id = cache.incr(SEQUENCE_KEY)
+            cache.set(
+                event_key(event_id), (channel, name, data), self.log_timeout
+            )
+        except Exception:
+            super().publish(channel, name, data)
+
+    def relay(self):
+        """Раздаёт подписчикам события, появившиеся в журнале.
+
+        Номер события выдаётся до записи самого события, поэтому
+        отсутствующую запись журнал ждёт до grace секунд и только потом
+        пропускает: иначе событие, дописанное чуть позже, потерялось бы.
+        """
+        last = cache.get(SEQUENCE_KEY, 0)
+        first = self._last_id + 1
+        if last < first:
+            return
+        first = max(first, last - self._recent.maxlen + 1)
+        logged = cache.get_many(
+            [event_key(event_id) for event_id in range(first, last + 1)]
+        )
+        now = time.monotonic()
+        for event_id in range(first, last + 1):
+            entry = logged.get(event_key(event_id))
+            if entry is None:
+                waiting_since = self._missing.setdefault(event_id, now)
+                if now - waiting_since < self.grace:
+                    break
+                self._skip(event_id)
+            else:
+                self.deliver(Event(event_id, *entry))
+        self._missing = {
+            event_id: since for event_id, since in self._missing.items()
+            if event_id > self._last_id
+        }
+
+    def _skip(self, event_id):
+        with self._lock:
+            self._last_id = max(self._last_id, event_id)
+
+    def _run_relay(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.relay()
+            except Exception:
+                logger.exception('Не удалось прочитать журнал событий')
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                if settings.EVENTS_BACKEND == 'cache':
+                    _broker = CacheBroker(
+                        settings.EVENTS_HISTORY,
+                        settings.EVENTS_QUEUE_SIZE,
+                        settings.EVENTS_RELAY_INTERVAL,
+                        settings.EVENTS_LOG_TIMEOUT,
+                        settings.EVENTS_RELAY_GRACE,
+                    )
+                else:
+                    _broker = Broker(
+                        settings.EVENTS_HISTORY, settings.EVENTS_QUEUE_SIZE
+                    )
+    return _broker
+
+
+def publish(channel, name, data):
+    get_broker().publish(channel, name, data)
+
+
+def _stream(subscription):
+    deadline = time.monotonic() + settings.EVENTS_STREAM_TIMEOUT
+    try:
+        yield f'retry: {settings.EVENTS_RETRY_MS}\n\n'
+        while time.monotonic() < deadline and not subscription.lagging:
+            event = subscription.get(settings.EVENTS_HEARTBEAT)
+            if event is None:
+                yield ': ping\n\n'
+                continue
+            yield (
+                f'id: {event.id}\nevent: {event.name}\n'
+                f'data: {json.dumps(event.data)}\n\n'
+            )
+    finally:
+        subscription.close()
+
+
+def sse_response(request, channels):
+    """Поток Server-Sent Events из каналов channels.
+
+    Поток закрывается через EVENTS_STREAM_TIMEOUT секунд или когда
+    клиент отстал, и браузер переподключается с Last-Event-ID.
+    Соединение с базой закрывается сразу: простаивающему потоку оно
+    не нужно.
+    """
+    last_id = request.META.get('HTTP_LAST_EVENT_ID', '')
+    subscription = get_broker().subscribe(
+        set(channels), int(last_id) if last_id.isdigit() else None
+    )
+    if not connection.in_atomic_block:
+        connection.close()
+    response = StreamingHttpResponse(
+        _stream(subscription), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
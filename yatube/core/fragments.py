@@ -0,0 +1,9 @@
+from django.template.loader import render_to_string
+
+from .page_cache import fragment
+
+
+@fragment('header')
+def header(request, params_list):
+    html = render_to_string('includes/header.html', request=request)
+    return [html] * len(params_list)
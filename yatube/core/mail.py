@@ -0,0 +1,107 @@
+import base64
+import smtplib
+import threading
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.message import sanitize_address
+
+from .tasks import task
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+class RawMessage:
+    """Собранное письмо из очереди.
+
+    Отдаёт бэкендам Django сохранённые байты вместо того, чтобы
+    собирать MIME-сообщение заново.
+    """
+    encoding = None
+
+    def __init__(self, from_email, to, raw):
+        self.from_email = from_email
+        self.to = to
+        self.raw = raw
+
+    def recipients(self):
+        return self.to
+
+    def message(self):
+        return self
+
+    def get_charset(self):
+        return None
+
+    def as_bytes(self, unixfrom=False, linesep='\n'):
+        return self.raw.replace(b'\n', linesep.encode())
+
+
+def serialize(message):
+    encoding = message.encoding or settings.DEFAULT_CHARSET
+    return {
+        'from': sanitize_address(message.from_email, encoding),
+        'to': [
+            sanitize_address(address, encoding)
+            for address in message.recipients()
+        ],
+        'raw': base64.b64encode(message.message().as_bytes()).decode(),
+    }
+
+
+def _delivery_backend():
+    """Бэкенд EMAIL_DELIVERY_BACKEND с открытым соединением на весь
+    процесс воркера: пачки писем не переподключаются к SMTP.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = get_connection(settings.EMAIL_DELIVERY_BACKEND)
+            _backend.open()
+        return _backend
+
+
+def _reconnect():
+    global _backend
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+            _backend = None
+    return _delivery_backend()
+
+
+@task
+def deliver(messages):
+    """Отправляет пачку писем из очереди.
+
+    Если сервер закрыл простаивавшее соединение, отправка повторяется
+    один раз через новое; остальные ошибки отдают задачу на повтор с
+    отсрочкой. Письма пачки, ушедшие до ошибки, при повторе будут
+    отправлены ещё раз.
+    """
+    emails = [
+        RawMessage(item['from'], item['to'], base64.b64decode(item['raw']))
+        for item in messages
+    ]
+    try:
+        _delivery_backend().send_messages(emails)
+    except smtplib.SMTPServerDisconnected:
+        _reconnect().send_messages(emails)
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Ставит письма в очередь задач пачками по EMAIL_BATCH_SIZE;
+    воркер отправляет их через EMAIL_DELIVERY_BACKEND.
+    """
+
+    def send_messages(self, email_messages):
+        messages = [
+            serialize(message) for message in email_messages
+            if message.recipients()
+        ]
+        size = settings.EMAIL_BATCH_SIZE
+        for start in range(0, len(messages), size):
+            deliver.delay(messages[start:start + size])
+        return len(messages)
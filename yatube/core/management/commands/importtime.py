@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.startup import measure_startup
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает новый процесс с django.setup() под python -X importtime '
+        'и показывает самые дорогие импорты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=20,
+            help='Сколько импортов показать.',
+        )
+        parser.add_argument(
+            '--module', action='append', default=[], dest='modules',
+            help='Дополнительно импортировать модуль, например yatube.wsgi.',
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Завершиться с ошибкой, если запуск дольше '
+                 'STARTUP_TIME_TARGET.',
+        )
+
+    def handle(self, *args, **options):
+        report = measure_startup(options['modules'])
+        imports = report.imports
+        total_ms = sum(item.self_us for item in imports) / 1000
+        self.stdout.write(
+            f'Запуск: {report.wall_ms:.0f} мс, импорты: {total_ms:.0f} мс, '
+            f'модулей: {len(imports)}'
+        )
+        self.stdout.write(f'{"собств., мс":>12} {"всего, мс":>10}  модуль')
+        top = sorted(imports, key=lambda item: -item.cumulative_us)
+        for item in top[:options['top']]:
+            self.stdout.write(
+                f'{item.self_us / 1000:12.1f} '
+                f'{item.cumulative_us / 1000:10.1f}'
+                f'  {"  " * item.depth}{item.name}'
+            )
+        if options['check'] and report.wall_ms > settings.STARTUP_TIME_TARGET:
+            raise CommandError(
+                f'Запуск занял {report.wall_ms:.0f} мс, '
+                f'цель {settings.STARTUP_TIME_TARGET} мс'
+            )
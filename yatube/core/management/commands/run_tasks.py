@@ -0,0 +1,77 @@
+import logging
+import multiprocessing
+import signal
+import threading
+from multiprocessing.connection import wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.tasks import work
+
+logger = logging.getLogger(__name__)
+
+
+def _work_until_terminated(burst):
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    signal.signal(signal.SIGINT, lambda *args: stop.set())
+    try:
+        return work(burst=burst, stop=stop)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает воркеры очереди задач. По SIGTERM воркеры '
+        'дорабатывают взятую пачку задач и завершаются; упавший '
+        'воркер заменяется новым.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=settings.TASK_WORKERS,
+            help='Сколько процессов-воркеров запустить.',
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Завершиться, когда очередь опустеет.',
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] <= 1:
+            done = _work_until_terminated(options['burst'])
+            self.stdout.write(f'Выполнено задач: {done}')
+            return
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        stopping = threading.Event()
+
+        def start():
+            process = context.Process(
+                target=_work_until_terminated, args=(options['burst'],)
+            )
+            process.start()
+            return process
+
+        processes = [start() for _ in range(options['workers'])]
+
+        def terminate(*args):
+            stopping.set()
+            for process in processes:
+                process.terminate()
+
+        signal.signal(signal.SIGTERM, terminate)
+        signal.signal(signal.SIGINT, terminate)
+        while processes:
+            wait([process.sentinel for process in processes])
+            for process in [p for p in processes if not p.is_alive()]:
+                processes.remove(process)
+                if process.exitcode and not stopping.is_set():
+                    logger.error(
+                        'Воркер %s завершился с кодом %s, запускаем новый',
+                        process.pid, process.exitcode,
+                    )
+                    processes.append(start())
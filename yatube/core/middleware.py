@@ -0,0 +1,117 @@
+import gzip
+import hashlib
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .caching import get_or_compute
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PRESERVE_RE = re.compile(
+    r'(<(pre|textarea|script|style)\b.*?</\2\s*>)',
+    re.IGNORECASE | re.DOTALL,
+)
+LINE_BREAK_RE = re.compile(r'[ \t]*\n\s*')
+ACCEPT_RE = re.compile(r'\b(br|gzip)\b')
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript')
+
+
+def minify_html(html):
+    """Схлопывает переводы строк вместе с отступами вокруг них.
+
+    Браузер показывает такую разметку так же, как исходную; содержимое
+    pre, textarea, script и style не меняется.
+    """
+    parts = PRESERVE_RE.split(html)
+    # split() с двумя группами возвращает текст, блок, имя тега, текст...
+    for index in range(0, len(parts), 3):
+        parts[index] = LINE_BREAK_RE.sub('\n', parts[index])
+    del parts[2::3]
+    return ''.join(parts)
+
+
+def _compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(
+            body, quality=settings.COMPRESSION_BROTLI_LEVEL
+        )
+    return gzip.compress(
+        body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0
+    )
+
+
+def compress(body, encoding, shared=False):
+    """Сжатое тело ответа.
+
+    Тела, общие для многих зрителей, сжимаются один раз и кэшируются
+    по хэшу содержимого.
+    """
+    if not shared:
+        return _compress(body, encoding)
+    digest = hashlib.md5(body).hexdigest()
+    return get_or_compute(
+        f'compressed:{encoding}:{digest}',
+        lambda: _compress(body, encoding),
+        settings.COMPRESSION_CACHE_TIMEOUT,
+    )
+
+
+def choose_encoding(request):
+    accepted = set(
+        ACCEPT_RE.findall(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    )
+    if 'br' in accepted and brotli is not None:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+class CompressionMiddleware:
+    """Минифицирует HTML и сжимает ответы brotli или gzip.
+
+    Общие страницы из shared_page, отданные анонимным зрителям,
+    кэшируются сжатыми по хэшу содержимого, поэтому одна и та же
+    страница из кэша не сжимается повторно. Остальные ответы, например
+    формы с новым CSRF-токеном, сжимаются без кэша.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (response.streaming or response.has_header('Content-Encoding')
+                or response.status_code != 200):
+            return response
+        content_type = response.get('Content-Type', '')
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        if (content_type.startswith('text/html')
+                and not getattr(response, 'minified', False)):
+            response.content = minify_html(
+                response.content.decode(response.charset)
+            )
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request)
+        if (encoding is None
+                or len(response.content) < settings.COMPRESSION_MIN_SIZE):
+            return response
+        user = getattr(request, 'user', None)
+        response.content = compress(
+            response.content, encoding,
+            shared=getattr(response, 'shared', False) and (
+                user is None or not user.is_authenticated
+            ),
+        )
+        response['Content-Length'] = str(len(response.content))
+        response['Content-Encoding'] = encoding
+        if response.has_header('ETag'):
+            response['ETag'] = re.sub(r'^(W/)?', 'W/', response['ETag'])
+        return response
@@ -0,0 +1,77 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """Отложенный вызов функции с декоратором @task.
+
+    Выполненные задачи удаляются; в таблице остаются ожидающие,
+    выполняющиеся и исчерпавшие попытки.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+    name = models.CharField(
+        verbose_name='Функция',
+        max_length=200,
+    )
+    arguments = models.TextField(
+        verbose_name='Аргументы (JSON)',
+    )
+    priority = models.SmallIntegerField(
+        verbose_name='Приоритет',
+        default=0,
+        help_text='Задачи с большим приоритетом выполняются раньше',
+    )
+    status = models.CharField(
+        verbose_name='Состояние',
+        max_length=10,
+        choices=STATUSES,
+        default=QUEUED,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток',
+        default=0,
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name='Наибольшее число попыток',
+    )
+    run_at = models.DateTimeField(
+        verbose_name='Выполнить не раньше',
+        default=timezone.now,
+    )
+    locked_by = models.CharField(
+        verbose_name='Воркер',
+        max_length=100,
+        blank=True,
+    )
+    locked_at = models.DateTimeField(
+        verbose_name='Взята воркером',
+        blank=True,
+        null=True,
+    )
+    last_error = models.TextField(
+        verbose_name='Последняя ошибка',
+        blank=True,
+    )
+    created = models.DateTimeField(
+        verbose_name='Дата создания',
+        auto_now_add=True,
+    )
+
+    class Meta:
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+        indexes = (
+            models.Index(
+                fields=('status', '-priority', 'run_at'), name='task_queue'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name} ({self.status})'
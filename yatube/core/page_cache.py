@@ -0,0 +1,152 @@
+import hashlib
+import re
+import uuid
+from functools import wraps
+from urllib.parse import parse_qsl, urlencode
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.http.response import HttpResponseBase
+from django.utils.safestring import mark_safe
+
+from .caching import Uncacheable, get_or_compute
+from .middleware import minify_html
+
+HOLE_RE = re.compile(r'<!--personal:([\w-]+)\?([^>]*)-->')
+
+_fragments = {}
+
+
+def fragment(name):
+    """Регистрирует функцию, которая заполняет дыры name на странице.
+
+    Функция получает запрос и параметры всех дыр с этим именем и
+    возвращает список HTML-фрагментов в том же порядке, поэтому данные
+    для всех дыр страницы можно выбрать одним запросом.
+    """
+    def decorator(func):
+        _fragments[name] = func
+        return func
+    return decorator
+
+
+def hole(request, name, params):
+    """Персональный фрагмент: метка в общей копии страницы
+    или сразу готовый HTML на остальных страницах.
+    """
+    if getattr(request, 'personal_holes', False):
+        return mark_safe(f'<!--personal:{name}?{urlencode(params)}-->')
+    return mark_safe(_fragments[name](request, [params])[0])
+
+
+def fill_holes(request, content):
+    holes = [
+        (match.group(1), dict(parse_qsl(match.group(2))))
+        for match in HOLE_RE.finditer(content)
+    ]
+    by_name = {}
+    for index, (name, params) in enumerate(holes):
+        by_name.setdefault(name, []).append((index, params))
+    rendered = {}
+    for name, items in by_name.items():
+        fragments = _fragments[name](
+            request, [params for _, params in items]
+        )
+        for (index, _), html in zip(items, fragments):
+            rendered[index] = html
+    indexes = iter(range(len(holes)))
+    return HOLE_RE.sub(lambda match: rendered[next(indexes)], content)
+
+
+def tag_key(tag):
+    return f'page:tag:{tag}'
+
+
+def bump(*tags):
+    """Делает недействительными все страницы с этими тегами."""
+    cache.set_many({tag_key(tag): uuid.uuid4().hex for tag in tags}, None)
+
+
+def _render_shell(view, request, args, kwargs):
+    request.personal_holes = True
+    try:
+        return view(request, *args, **kwargs)
+    finally:
+        request.personal_holes = False
+
+
+def _personalize(request, response):
+    if not response.streaming:
+        response.content = fill_holes(
+            request, response.content.decode(response.charset)
+        )
+    return response
+
+
+def personalized(view):
+    """Рендерит страницу с метками и заполняет их пачкой.
+
+    Для страниц, которые не кэшируются, но используют те же фрагменты.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        return _personalize(
+            request, _render_shell(view, request, args, kwargs)
+        )
+    return wrapper
+
+
+def shared_page(timeout, key_prefix, tags=None):
+    """Кэширует одну копию страницы на всех зрителей.
+
+    Персональные части страницы выводятся тегом {% personal %} и
+    заполняются на каждом запросе. tags(request, *args, **kwargs)
+    возвращает теги страницы: bump() любого из них сбрасывает копию.
+    Копию пересчитывает один запрос, остальные тем временем получают
+    предыдущую.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return personalized(view)(request, *args, **kwargs)
+            path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+            key = f'page:{key_prefix}:{path}'
+            tag_keys = [
+                tag_key(tag)
+                for tag in (tags(request, *args, **kwargs) if tags else ())
+            ]
+            cached = cache.get_many([key, *tag_keys])
+            versions = {tag: cached.get(tag) for tag in tag_keys}
+            missing = {
+                tag: uuid.uuid4().hex
+                for tag, version in versions.items() if version is None
+            }
+            if missing:
+                cache.set_many(missing, None)
+                versions.update(missing)
+            rendered = []
+
+            def render():
+                response = _render_shell(view, request, args, kwargs)
+                if response.status_code != 200 or response.streaming:
+                    raise Uncacheable(_personalize(request, response))
+                rendered.append(response)
+                return versions, minify_html(
+                    response.content.decode(response.charset)
+                )
+
+            entry = get_or_compute(
+                key, render, timeout,
+                valid=lambda entry: entry[0] == versions,
+                cached=cached.get(key),
+            )
+            if isinstance(entry, HttpResponseBase):
+                return entry
+            response = rendered[0] if rendered else HttpResponse()
+            response.content = fill_holes(request, entry[1])
+            response.minified = True
+            response.shared = True
+            return response
+        return wrapper
+    return decorator
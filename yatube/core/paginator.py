@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator, который берёт число объектов из готового счётчика.
+
+    estimate() возвращает приблизительное число объектов или None.
+    Списки без оценки и списки меньше PAGINATOR_EXACT_COUNT_THRESHOLD
+    считаются точно.
+    """
+
+    def __init__(self, object_list, per_page, estimate=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.estimate = estimate
+
+    @cached_property
+    def count(self):
+        estimated = self.estimate() if self.estimate else None
+        if (estimated is None
+                or estimated < settings.PAGINATOR_EXACT_COUNT_THRESHOLD):
+            return super().count
+        return estimated
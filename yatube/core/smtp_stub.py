@@ -0,0 +1,103 @@
+import socketserver
+import threading
+from collections import namedtuple
+
+Received = namedtuple('Received', 'mail_from rcpt_tos data')
+
+
+def _address(command):
+    """Адрес из 'MAIL FROM:<a@b> SIZE=10' или 'RCPT TO:<a@b>'."""
+    return command.split(':', 1)[1].split()[0].strip('<>')
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def read_data(self):
+        lines = []
+        for line in self.rfile:
+            if line == b'.\r\n':
+                break
+            if line.startswith(b'..'):
+                line = line[1:]
+            lines.append(line)
+        return b''.join(lines)
+
+    def handle(self):
+        stub = self.server.stub
+        with stub.lock:
+            stub.connections += 1
+        self.reply('220 localhost SMTP stub')
+        mail_from, rcpt_tos = None, []
+        for line in self.rfile:
+            command = line.decode().strip()
+            verb = command[:4].upper()
+            if verb in ('HELO', 'EHLO'):
+                self.reply('250 localhost')
+            elif verb == 'MAIL':
+                mail_from, rcpt_tos = _address(command), []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                rcpt_tos.append(_address(command))
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                with stub.lock:
+                    stub.messages.append(
+                        Received(mail_from, rcpt_tos, self.read_data())
+                    )
+                self.reply('250 OK')
+            elif verb in ('RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class SMTPStub:
+    """Локальный SMTP-сервер для тестов.
+
+    Принимает письма без проверок и складывает их в messages;
+    connections — сколько раз к нему подключались.
+
+        with SMTPStub() as smtp:
+            with override_settings(EMAIL_PORT=smtp.port):
+                ...
+    """
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.messages = []
+        self.connections = 0
+        self.lock = threading.Lock()
+        self._server = _Server((host, port), _Handler)
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,81 @@
+import gc
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import reverse
+
+from .throttling import get_buckets
+
+IMPORT_LINE_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+Import = namedtuple('Import', 'name self_us cumulative_us depth')
+StartupReport = namedtuple('StartupReport', 'wall_ms imports')
+
+BOOT_CODE = 'import django; django.setup()'
+
+
+def parse_importtime(output):
+    """Разбирает вывод python -X importtime в список Import."""
+    imports = []
+    for line in output.splitlines():
+        match = IMPORT_LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            imports.append(Import(
+                name, int(self_us), int(cumulative_us), len(indent) // 2
+            ))
+    return imports
+
+
+def measure_startup(modules=()):
+    """Запускает новый процесс с django.setup() и импортом modules
+    и возвращает время его жизни и импорты с их стоимостью.
+    """
+    code = BOOT_CODE + ''.join(f'; import {name}' for name in modules)
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=settings.BASE_DIR, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True, check=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    return StartupReport(wall_ms, parse_importtime(result.stderr))
+
+
+def preload():
+    """Загружает в мастер-процессе то, что воркеры иначе грузили бы
+    на первом запросе: URL-схему вместе с админкой, частые шаблоны,
+    модули из STARTUP_PRELOAD_MODULES и корзины лимитов запросов.
+    С STARTUP_WARM_CACHE ещё и прогревает кэш, чтобы воркеры получили
+    его копию.
+
+    Соединения с базой и кэшем закрываются, чтобы воркеры не унаследовали их.
+    После форка воркеры делят эти страницы памяти с мастером;
+    gc.freeze() убирает загруженные объекты из обхода сборщика,
+    чтобы он не копировал страницы, меняя счётчики в заголовках.
+    """
+    reverse('posts:index')
+    get_buckets()
+    for name in settings.STARTUP_PRELOAD_TEMPLATES:
+        get_template(name)
+    for name in settings.STARTUP_PRELOAD_MODULES:
+        __import__(name)
+    if settings.STARTUP_WARM_CACHE:
+        call_command('warm_cache', verbosity=0)
+    connections.close_all()
+    for cache in caches.all():
+        cache.close()
+    gc.collect()
+    gc.freeze()
@@ -0,0 +1,210 @@
+import json
+import logging
+import os
+import socket
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(func=None, *, priority=0, max_attempts=None):
+    """Делает функцию задачей: func.delay(*args, **kwargs) ставит её
+    вызов в очередь, а выполняет его воркер run_tasks.
+
+    Аргументы должны сериализоваться в JSON.
+    """
+    def decorator(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+        _registry[name] = func
+
+        def delay(*args, **kwargs):
+            return enqueue(name, args, kwargs, priority, max_attempts)
+
+        func.delay = delay
+        return func
+
+    if func is None:
+        return decorator
+    return decorator(func)
+
+
+def _resolve(name):
+    if name not in _registry:
+        import_string(name)
+    return _registry[name]
+
+
+def enqueue(name, args=(), kwargs=None, priority=0, max_attempts=None):
+    """Ставит вызов в очередь в текущей транзакции, поэтому воркер
+    увидит задачу только вместе с данными, которые её породили.
+
+    С TASKS_EAGER задача выполняется сразу.
+    """
+    arguments = json.dumps({'args': list(args), 'kwargs': kwargs or {}})
+    if settings.TASKS_EAGER:
+        arguments = json.loads(arguments)
+        _resolve(name)(*arguments['args'], **arguments['kwargs'])
+        return None
+    return Task.objects.create(
+        name=name,
+        arguments=arguments,
+        priority=priority,
+        max_attempts=max_attempts or settings.TASK_MAX_ATTEMPTS,
+    )
+
+
+def claim(worker, limit):
+    """Забирает до limit готовых задач, начиная с приоритетных.
+
+    Задача достаётся тому воркеру, чей UPDATE первым сменил её
+    состояние. Задачи, которые воркер не продлевал дольше
+    TASK_LOCK_TIMEOUT секунд, считаются брошенными и выдаются снова,
+    а исчерпавшие попытки помечаются FAILED.
+    """
+    now = timezone.now()
+    abandoned = Q(
+        status=Task.RUNNING,
+        locked_at__lt=now - timedelta(seconds=settings.TASK_LOCK_TIMEOUT),
+    )
+    exhausted = Q(attempts__gte=F('max_attempts'))
+    Task.objects.filter(abandoned & exhausted).update(
+        status=Task.FAILED,
+        last_error='Воркер не завершил последнюю попытку',
+        locked_at=None,
+    )
+    candidates = Task.objects.filter(
+        Q(status=Task.QUEUED, run_at__lte=now) | (abandoned & ~exhausted)
+    ).order_by('-priority', 'run_at').values_list(
+        'pk', 'status', 'locked_at'
+    )[:limit]
+    claimed = [
+        pk for pk, status, locked_at in candidates
+        if Task.objects.filter(
+            pk=pk, status=status, locked_at=locked_at
+        ).update(
+            status=Task.RUNNING,
+            locked_by=worker,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+        )
+    ]
+    return list(
+        Task.objects.filter(pk__in=claimed).order_by('-priority', 'run_at')
+    )
+
+
+def heartbeat(worker):
+    """Продлевает блокировку задач, которые выполняет worker."""
+    return Task.objects.filter(
+        status=Task.RUNNING, locked_by=worker
+    ).update(locked_at=timezone.now())
+
+
+@contextmanager
+def _heartbeat(worker):
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(settings.TASK_HEARTBEAT_INTERVAL):
+            try:
+                heartbeat(worker)
+            except Exception:
+                logger.exception('Воркер %s не продлил задачи', worker)
+        connections.close_all()
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run(task):
+    """Выполняет задачу. Упавшая задача повторяется через
+    TASK_RETRY_DELAY * 2 ** (попытка - 1) секунд, пока не исчерпает
+    max_attempts.
+    """
+    mine = Task.objects.filter(pk=task.pk, locked_by=task.locked_by)
+    arguments = json.loads(task.arguments)
+    try:
+        _resolve(task.name)(*arguments['args'], **arguments['kwargs'])
+    except Exception:
+        logger.exception('Задача %s не выполнена', task)
+        error = traceback.format_exc()
+        if task.attempts >= task.max_attempts:
+            mine.update(status=Task.FAILED, last_error=error, locked_at=None)
+        else:
+            delay = settings.TASK_RETRY_DELAY * 2 ** (task.attempts - 1)
+            mine.update(
+                status=Task.QUEUED,
+                run_at=timezone.now() + timedelta(seconds=delay),
+                last_error=error,
+                locked_by='',
+                locked_at=None,
+            )
+        return False
+    mine.delete()
+    return True
+
+
+def _close_broken_connections():
+    # Соединение внутри транзакции (например, в тестах) закрывать нельзя.
+    for connection in connections.all():
+        if not connection.in_atomic_block:
+            connection.close_if_unusable_or_obsolete()
+
+
+def work(burst=False, stop=None):
+    """Цикл воркера: берёт задачи пачками по TASK_BATCH_SIZE, а когда
+    очередь пуста, ждёт TASK_POLL_INTERVAL секунд или, с burst,
+    завершается. После stop.set() дорабатывает текущую пачку.
+    Пока пачка выполняется, фоновый поток раз в
+    TASK_HEARTBEAT_INTERVAL секунд продлевает её задачи.
+
+    Ошибка базы не останавливает воркер: он пишет её в лог, ждёт
+    всё дольше, до TASK_ERROR_BACKOFF секунд, и пробует снова, а
+    между пачками закрывает сломанные и устаревшие соединения.
+    Возвращает число выполненных задач.
+    """
+    worker = f'{socket.gethostname()}:{os.getpid()}'
+    stop = stop or threading.Event()
+    done = 0
+    errors = 0
+    while not stop.is_set():
+        _close_broken_connections()
+        try:
+            tasks = claim(worker, settings.TASK_BATCH_SIZE)
+            if not tasks:
+                if burst:
+                    break
+                stop.wait(settings.TASK_POLL_INTERVAL)
+                continue
+            with _heartbeat(worker):
+                for task in tasks:
+                    run(task)
+                    done += 1
+        except Exception:
+            errors += 1
+            logger.exception('Ошибка цикла воркера %s', worker)
+            stop.wait(min(
+                settings.TASK_POLL_INTERVAL * 2 ** errors,
+                settings.TASK_ERROR_BACKOFF,
+            ))
+        else:
+            errors = 0
+    return done
@@ -0,0 +1,62 @@
+import re
+
+from django.template import TemplateDoesNotExist
+from django.template.loaders import app_directories, filesystem
+
+INCLUDE_RE = re.compile(
+    r"""{%\s*include\s+(['"])([^'"]+)\1(?:\s+with\s+(.*?))?\s*%}"""
+)
+ONLY_RE = re.compile(r'\bonly$')
+
+
+class InliningMixin:
+    """Подставляет текст шаблонов из {% include 'имя' %} прямо в шаблон.
+
+    Включения с постоянным именем компилируются вместе с родителем, и
+    при рендере цикла не нужно на каждой итерации искать и вызывать
+    отдельный шаблон. {% include ... with ... %} превращается в
+    {% with %}; включения с only, переменным именем или по кругу
+    остаются как есть.
+    """
+
+    def get_contents(self, origin):
+        return self.inline(
+            super().get_contents(origin), (origin.template_name,)
+        )
+
+    def raw_contents(self, origin):
+        return super().get_contents(origin)
+
+    def find_source(self, name):
+        for loader in self.engine.template_loaders:
+            for origin in loader.get_template_sources(name):
+                source_loader = origin.loader
+                try:
+                    if isinstance(source_loader, InliningMixin):
+                        return source_loader.raw_contents(origin)
+                    return source_loader.get_contents(origin)
+                except TemplateDoesNotExist:
+                    continue
+        return None
+
+    def inline(self, source, stack):
+        def replace(match):
+            name, extra = match.group(2), match.group(3)
+            if name in stack or (extra and ONLY_RE.search(extra)):
+                return match.group(0)
+            included = self.find_source(name)
+            if included is None:
+                return match.group(0)
+            included = self.inline(included, stack + (name,))
+            if extra:
+                return f'{{% with {extra} %}}{included}{{% endwith %}}'
+            return included
+        return INCLUDE_RE.sub(replace, source)
+
+
+class FilesystemLoader(InliningMixin, filesystem.Loader):
+    pass
+
+
+class AppDirectoriesLoader(InliningMixin, app_directories.Loader):
+    pass
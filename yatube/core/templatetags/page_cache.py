@@ -0,0 +1,10 @@
+from django import template
+
+from core.page_cache import hole
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def personal(context, name, **params):
+    return hole(context['request'], name, params)
@@ -1,4 +1,45 @@
-from django.test import TestCase, Client
+import gzip
+import os
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail as django_mail
+from django.core.cache import cache
+from django.db import OperationalError
+from django.template import engines
+from django.test import TestCase, Client, RequestFactory, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from yatube.settings.checks import check_production
+
+from posts.models import Post
+
+from . import (
+    caching, events, mail, middleware, startup, tasks, throttling,
+)
+from .models import Task
+from .smtp_stub import SMTPStub
+
+calls = []
+
+
+@tasks.task
+def remember(value):
+    calls.append(value)
+
+
+@tasks.task(priority=5)
+def remember_first(value):
+    calls.append(value)
+
+
+@tasks.task(max_attempts=2)
+def fail():
+    raise ValueError('сбой')
 
 
 class ViewTestClass(TestCase):
@@ -11,3 +52,444 @@ class ViewTestClass(TestCase):
         response = self.client.get('/nonexist-page/')
         self.assertEqual(response.status_code, 404)
         self.assertTemplateUsed(response, 'core/404.html')
+
+
+class GetOrComputeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caching.reset_stats()
+
+    def test_concurrent_misses_compute_once(self):
+        """Одновременные промахи по одному ключу считают значение
+        один раз.
+        """
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'значение'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                caching.get_or_compute('key', compute, 60)
+            ))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['значение'] * 5)
+        self.assertEqual(caching.stats()['coalesced'], 4)
+
+    def test_stale_value_served_while_recomputing(self):
+        """Пока запись пересчитывает другой запрос, отдаётся
+        устаревшее значение.
+        """
+        caching.put('key', 'старое', 0)
+        cache.add(caching.lock_key('key'), 1)
+        value = caching.get_or_compute('key', lambda: 'новое', 60)
+        self.assertEqual(value, 'старое')
+        self.assertEqual(caching.stats()['avoided'], 1)
+        cache.delete(caching.lock_key('key'))
+        value = caching.get_or_compute('key', lambda: 'новое', 60)
+        self.assertEqual(value, 'новое')
+
+    def test_slow_values_recomputed_early(self):
+        """Долго считающееся значение пересчитывается до срока."""
+        caching.put('key', 'старое', 1, delta=1000)
+        with mock.patch('core.caching.random.random', return_value=0.5):
+            value = caching.get_or_compute('key', lambda: 'новое', 60)
+        self.assertEqual(value, 'новое')
+        self.assertEqual(caching.stats()['early'], 1)
+
+    def test_uncacheable_value_not_stored(self):
+        """Значение из Uncacheable возвращается, но не сохраняется."""
+
+        def compute():
+            raise caching.Uncacheable('ошибка')
+
+        self.assertEqual(caching.get_or_compute('key', compute, 60), 'ошибка')
+        self.assertIsNone(caching.peek('key'))
+        self.assertIsNone(cache.get(caching.lock_key('key')))
+
+    def test_concurrent_updates_are_not_lost(self):
+        """Изменения записи из разных потоков не теряют друг друга."""
+        caching.put('key', [], 60)
+
+        def append(number):
+            def change(value):
+                time.sleep(0.001)
+                return value + [number]
+            caching.update('key', change, 60)
+
+        threads = [
+            threading.Thread(target=append, args=(number,))
+            for number in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(caching.peek('key')), list(range(10)))
+
+    @override_settings(CACHE_LOCK_WAIT=0)
+    def test_update_drops_entry_when_locked(self):
+        """Если замок занят, запись удаляется и пересчитается."""
+        caching.put('key', [1], 60)
+        cache.add(caching.lock_key('key'), 1)
+        caching.update('key', lambda value: value + [2], 60)
+        self.assertIsNone(caching.peek('key'))
+
+
+class CompressionMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_minify_keeps_preformatted_blocks(self):
+        """Минификация не трогает pre, textarea, script и style."""
+        html = (
+            '<div>\n    <p>Текст</p>\n  </div>\n'
+            '<pre>\n  код\n    отступ\n</pre>\n  <textarea>\n  a\n</textarea>'
+        )
+        self.assertEqual(
+            middleware.minify_html(html),
+            '<div>\n<p>Текст</p>\n</div>\n'
+            '<pre>\n  код\n    отступ\n</pre>\n<textarea>\n  a\n</textarea>',
+        )
+
+    def test_gzip_response_is_cached_by_content(self):
+        """Общая страница для анонима сжимается один раз."""
+        plain = self.client.get('/')
+        response = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        with mock.patch.object(middleware, '_compress') as compress:
+            self.client.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        compress.assert_not_called()
+
+    def test_other_responses_are_not_cached(self):
+        """Страницы не из shared_page сжимаются без кэша."""
+        with mock.patch.object(middleware, 'get_or_compute') as cached:
+            response = self.client.get(
+                '/auth/login/', HTTP_ACCEPT_ENCODING='gzip'
+            )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        cached.assert_not_called()
+
+
+class InliningLoaderTests(TestCase):
+    def test_static_includes_are_inlined(self):
+        """Включения с постоянным именем подставляются в шаблон."""
+        loader = engines['django'].engine.template_loaders[0]
+        origin = next(loader.get_template_sources('posts/profile.html'))
+        source = origin.loader.get_contents(origin)
+        self.assertNotIn('{% include', source)
+        self.assertIn(
+            "{% with hide_follow=True %}{% load thumbnail %}", source
+        )
+        self.assertIn("{% personal 'follow_button'", source)
+
+
+class ProductionSettingsTests(TestCase):
+    def test_debug_options_are_rejected(self):
+        """Боевой профиль не принимает отладочные настройки."""
+        settings = {
+            'DEBUG': True,
+            'SECRET_KEY': '',
+            'ALLOWED_HOSTS': [],
+            'CACHES': {'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            }},
+            'DATABASES': {'default': {
+                'ENGINE': 'django.db.backends.sqlite3',
+            }},
+            'EVENTS_BACKEND': 'local',
+            'TEMPLATES': [{'OPTIONS': {'debug': True}}],
+        }
+        self.assertEqual(len(check_production(settings)), 7)
+        settings.update(
+            DEBUG=False,
+            SECRET_KEY='x',
+            ALLOWED_HOSTS=['example.com'],
+            CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.memcached'
+                           '.MemcachedCache',
+            }},
+            DATABASES={'default': {
+                'ENGINE': 'django.db.backends.postgresql',
+            }},
+            EVENTS_BACKEND='cache',
+            TEMPLATES=[{'OPTIONS': {}}],
+        )
+        self.assertEqual(check_production(settings), [])
+
+
+class StartupTests(TestCase):
+    def test_parse_importtime(self):
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |   django.utils\n'
+            'import time:       300 |        420 | django\n'
+        )
+        self.assertEqual(startup.parse_importtime(output), [
+            startup.Import('django.utils', 120, 120, 1),
+            startup.Import('django', 300, 420, 0),
+        ])
+
+    def test_setup_does_not_import_admin_modules(self):
+        """Модули админки подключаются URL-схемой, а не django.setup()."""
+        names = {item.name for item in startup.measure_startup().imports}
+        self.assertIn('posts.signals', names)
+        self.assertNotIn('posts.admin', names)
+        self.assertNotIn('PIL.Image', names)
+
+    @override_settings(STARTUP_WARM_CACHE=True)
+    def test_preload_closes_cache_connections_before_freeze(self):
+        backend = mock.Mock()
+        order = mock.Mock()
+        order.attach_mock(backend.close, 'close')
+        with mock.patch.object(startup, 'call_command'), \
+                mock.patch.object(startup, 'caches') as caches, \
+                mock.patch.object(startup, 'gc') as gc:
+            caches.all.return_value = [backend]
+            order.attach_mock(gc.freeze, 'freeze')
+            startup.preload()
+        self.assertEqual(
+            order.mock_calls, [mock.call.close(), mock.call.freeze()]
+        )
+
+
+class ThrottleTests(TestCase):
+    def setUp(self):
+        throttling._buckets = None
+
+    def tearDown(self):
+        throttling._buckets = None
+
+    def test_bucket_refills_over_period(self):
+        buckets = throttling.LocalBuckets(max_keys=10)
+        for _ in range(3):
+            self.assertEqual(buckets.take('key', 3, 60, now=100), 0)
+        self.assertAlmostEqual(buckets.take('key', 3, 60, now=100), 20)
+        self.assertEqual(buckets.take('other', 3, 60, now=100), 0)
+        self.assertEqual(buckets.take('key', 3, 60, now=120), 0)
+
+    def test_shared_buckets_survive_fork(self):
+        """Токены, взятые дочерним процессом, видны родителю."""
+        buckets = throttling.SharedBuckets(slots=16)
+        pid = os.fork()
+        if pid == 0:
+            buckets.take('key', 1, 60, now=100)
+            os._exit(0)
+        os.waitpid(pid, 0)
+        self.assertGreater(buckets.take('key', 1, 60, now=100), 0)
+
+    @override_settings(TRUSTED_PROXIES=['10.0.0.0/8'])
+    def test_client_ip_behind_trusted_proxy(self):
+        """За доверенным прокси IP берётся из X-Forwarded-For."""
+        factory = RequestFactory()
+        request = factory.get(
+            '/', REMOTE_ADDR='10.0.0.1',
+            HTTP_X_FORWARDED_FOR='6.6.6.6, 1.2.3.4, 10.0.0.2',
+        )
+        self.assertEqual(throttling.client_ip(request), '1.2.3.4')
+        request = factory.get(
+            '/', REMOTE_ADDR='5.5.5.5', HTTP_X_FORWARDED_FOR='1.2.3.4',
+        )
+        self.assertEqual(throttling.client_ip(request), '5.5.5.5')
+        request = factory.get('/', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(throttling.client_ip(request), '10.0.0.1')
+
+    @override_settings(THROTTLE_RATES={'comment': '2/m'})
+    def test_view_returns_429_with_retry_after(self):
+        user = get_user_model().objects.create_user(username='Spammer')
+        post = Post.objects.create(author=user, text='Текст')
+        client = Client()
+        client.force_login(user)
+        url = reverse('posts:add_comment', args=[post.pk])
+        for _ in range(2):
+            response = client.post(url, {'text': 'Спам'})
+            self.assertEqual(response.status_code, 302)
+        response = client.post(url, {'text': 'Спам'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(post.comments.count(), 2)
+
+
+@override_settings(TASKS_EAGER=False, TASK_RETRY_DELAY=10)
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_tasks_run_by_priority(self):
+        remember.delay('обычная')
+        remember_first.delay('срочная')
+        self.assertEqual(calls, [])
+        self.assertEqual(tasks.work(burst=True), 2)
+        self.assertEqual(calls, ['срочная', 'обычная'])
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(TASK_POLL_INTERVAL=0)
+    def test_database_error_does_not_stop_worker(self):
+        """Ошибка базы пишется в лог, и воркер продолжает работу."""
+        remember.delay('после ошибки')
+        claim = tasks.claim
+        errors = [OperationalError('database is locked')]
+
+        def flaky_claim(worker, limit):
+            if errors:
+                raise errors.pop()
+            return claim(worker, limit)
+
+        with mock.patch.object(tasks, 'claim', flaky_claim):
+            with self.assertLogs('core.tasks', 'ERROR'):
+                self.assertEqual(tasks.work(burst=True), 1)
+        self.assertEqual(calls, ['после ошибки'])
+
+    def test_failed_task_retried_with_backoff(self):
+        fail.delay()
+        before = timezone.now()
+        self.assertEqual(tasks.work(burst=True), 1)
+        task = Task.objects.get()
+        self.assertEqual(task.status, Task.QUEUED)
+        self.assertEqual(task.attempts, 1)
+        self.assertIn('ValueError', task.last_error)
+        self.assertGreaterEqual(task.run_at, before + timedelta(seconds=10))
+        Task.objects.update(run_at=timezone.now())
+        tasks.work(burst=True)
+        self.assertEqual(Task.objects.get().status, Task.FAILED)
+
+    def test_abandoned_task_is_claimed_again(self):
+        remember.delay('брошенная')
+        Task.objects.update(
+            status=Task.RUNNING,
+            locked_by='dead:1',
+            locked_at=timezone.now() - timedelta(hours=1),
+        )
+        self.assertEqual(tasks.work(burst=True), 1)
+        self.assertEqual(calls, ['брошенная'])
+
+    def test_abandoned_task_without_attempts_fails(self):
+        """Брошенная задача без оставшихся попыток не выдаётся снова."""
+        fail.delay()
+        Task.objects.update(
+            status=Task.RUNNING,
+            attempts=2,
+            locked_by='dead:1',
+            locked_at=timezone.now() - timedelta(hours=1),
+        )
+        self.assertEqual(tasks.claim('alive:2', 10), [])
+        task = Task.objects.get()
+        self.assertEqual(task.status, Task.FAILED)
+        self.assertEqual(task.attempts, 2)
+
+    def test_heartbeat_keeps_long_task(self):
+        """Продлённая задача не считается брошенной."""
+        remember.delay('долгая')
+        [task] = tasks.claim('busy:1', 10)
+        Task.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(tasks.heartbeat('busy:1'), 1)
+        self.assertEqual(tasks.claim('other:2', 10), [])
+        self.assertTrue(tasks.run(task))
+        self.assertEqual(calls, ['долгая'])
+
+
+class EventBrokerTests(TestCase):
+    def test_subscribers_get_events_of_their_channels(self):
+        broker = events.Broker(history=10, queue_size=2)
+        subscription = broker.subscribe({'group:a'})
+        broker.publish('group:a', 'post', {'id': 1})
+        broker.publish('group:b', 'post', {'id': 2})
+        self.assertEqual(
+            subscription.get(timeout=0),
+            events.Event(1, 'group:a', 'post', {'id': 1}),
+        )
+        self.assertIsNone(subscription.get(timeout=0))
+        for post_id in range(3):
+            broker.publish('group:a', 'post', {'id': post_id})
+        self.assertTrue(subscription.lagging)
+        subscription.close()
+        resumed = broker.subscribe({'group:a'}, last_id=3)
+        self.assertEqual(resumed.get(timeout=0).id, 4)
+
+    def test_cache_broker_relays_between_processes(self):
+        """События одного процесса доходят до подписчиков другого
+        через журнал в кэше.
+        """
+        cache.clear()
+        publisher = events.CacheBroker(
+            10, 10, interval=60, log_timeout=60, grace=60
+        )
+        reader = events.CacheBroker(
+            10, 10, interval=60, log_timeout=60, grace=60
+        )
+        subscription = reader.subscribe({'post:1'})
+        publisher.publish('post:1', 'comment', {'id': 7})
+        reader.relay()
+        event = subscription.get(timeout=0)
+        self.assertEqual(event.data, {'id': 7})
+        self.assertEqual(event.id, cache.get(events.SEQUENCE_KEY))
+
+    def test_relay_waits_for_entry_being_written(self):
+        """Номер без записи не теряет событие, дописанное позже,
+        а после grace секунд пропускается.
+        """
+        cache.clear()
+        reader = events.CacheBroker(
+            10, 10, interval=60, log_timeout=60, grace=60
+        )
+        subscription = reader.subscribe({'post:1'})
+        cache.add(events.SEQUENCE_KEY, 0, None)
+        slow_id = cache.incr(events.SEQUENCE_KEY)
+        reader.publish('post:1', 'comment', {'id': 2})
+        reader.relay()
+        self.assertIsNone(subscription.get(timeout=0))
+        cache.set(
+            events.event_key(slow_id), ('post:1', 'comment', {'id': 1}), 60
+        )
+        reader.relay()
+        self.assertEqual(subscription.get(timeout=0).data, {'id': 1})
+        self.assertEqual(subscription.get(timeout=0).data, {'id': 2})
+        cache.incr(events.SEQUENCE_KEY)
+        reader.publish('post:1', 'comment', {'id': 4})
+        reader.grace = 0
+        reader.relay()
+        self.assertEqual(subscription.get(timeout=0).data, {'id': 4})
+
+
+@override_settings(
+    TASKS_EAGER=False,
+    EMAIL_BACKEND='core.mail.QueuedEmailBackend',
+    EMAIL_DELIVERY_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+    EMAIL_HOST='127.0.0.1',
+    EMAIL_USE_TLS=False,
+)
+class QueuedEmailTests(TestCase):
+    def tearDown(self):
+        if mail._backend is not None:
+            mail._backend.close()
+        mail._backend = None
+
+    def test_messages_are_sent_by_worker_over_one_connection(self):
+        """Письма отправляет воркер, пачки идут через одно соединение."""
+        with SMTPStub() as smtp, override_settings(EMAIL_PORT=smtp.port):
+            for number in range(2):
+                django_mail.send_mail(
+                    f'Письмо {number}', 'Текст', 'yatube@example.com',
+                    [f'reader{number}@example.com'],
+                )
+            self.assertEqual(Task.objects.count(), 2)
+            self.assertEqual(smtp.messages, [])
+            self.assertEqual(tasks.work(burst=True), 2)
+            self.assertEqual(
+                [message.rcpt_tos for message in smtp.messages],
+                [['reader0@example.com'], ['reader1@example.com']],
+            )
+            self.assertIn(b'Subject: =?utf-8?', smtp.messages[0].data)
+            self.assertEqual(smtp.connections, 1)
+        self.assertFalse(Task.objects.exists())
@@ -0,0 +1,200 @@
+import ipaddress
+import math
+import mmap
+import multiprocessing
+import threading
+import time
+import zlib
+from functools import lru_cache, wraps
+
+from django.conf import settings
+from django.http import HttpResponse
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+UNSAFE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+_buckets = None
+_buckets_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """'10/m' -> (10, 60): не больше 10 запросов за 60 секунд."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+class Buckets:
+    """Корзины токенов, по одной на ключ.
+
+    Корзина хранится одним числом — моментом, когда она снова будет
+    полной (GCRA). Каждый запрос сдвигает его на period / limit; если
+    момент уходит дальше чем на period вперёд, токенов нет.
+    """
+
+    def take(self, key, limit, period, now=None):
+        """Берёт токен из корзины key.
+
+        Возвращает 0 или число секунд, через которое токен появится.
+        """
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            full_at = max(self._load(key), now) + period / limit
+            wait = full_at - now - period
+            if wait <= 0:
+                self._store(key, full_at, now)
+        return max(wait, 0)
+
+
+class LocalBuckets(Buckets):
+    """Корзины в памяти процесса: у каждого воркера свои лимиты."""
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self._full_at = {}
+        self._lock = threading.Lock()
+
+    def _load(self, key):
+        return self._full_at.get(key, 0.0)
+
+    def _store(self, key, full_at, now):
+        if len(self._full_at) >= self.max_keys:
+            # Полные корзины ничем не отличаются от отсутствующих.
+            self._full_at = {
+                key: value for key, value in self._full_at.items()
+                if value > now
+            }
+            if len(self._full_at) >= self.max_keys:
+                self._full_at.clear()
+        self._full_at[key] = full_at
+
+
+class SharedBuckets(Buckets):
+    """Корзины в разделяемой памяти, общие для воркеров.
+
+    Память выделяется до форка (см. core.startup.preload), ключи
+    раскладываются по slots ячейкам по crc32; ключи с одной ячейкой
+    делят лимит, поэтому ячеек должно быть намного больше активных
+    ключей.
+    """
+
+    def __init__(self, slots):
+        self._memory = mmap.mmap(-1, slots * 8)
+        self._full_at = memoryview(self._memory).cast('d')
+        self._lock = multiprocessing.Lock()
+
+    def _slot(self, key):
+        return zlib.crc32(key.encode()) % len(self._full_at)
+
+    def _load(self, key):
+        return self._full_at[self._slot(key)]
+
+    def _store(self, key, full_at, now):
+        self._full_at[self._slot(key)] = full_at
+
+
+def get_buckets():
+    global _buckets
+    if _buckets is None:
+        with _buckets_lock:
+            if _buckets is None:
+                if settings.THROTTLE_BACKEND == 'shared':
+                    _buckets = SharedBuckets(settings.THROTTLE_SHARED_SLOTS)
+                else:
+                    _buckets = LocalBuckets(settings.THROTTLE_MAX_KEYS)
+    return _buckets
+
+
+@lru_cache(maxsize=None)
+def _trusted_networks(proxies):
+    return tuple(ipaddress.ip_network(proxy) for proxy in proxies)
+
+
+def _is_trusted(address):
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(
+        address in network
+        for network in _trusted_networks(tuple(settings.TRUSTED_PROXIES))
+    )
+
+
+def client_ip(request):
+    """IP клиента с учётом прокси из TRUSTED_PROXIES.
+
+    Если запрос пришёл от доверенного прокси, X-Forwarded-For читается
+    справа налево до первого адреса, который добавил не доверенный
+    прокси: более левые адреса клиент мог подставить сам.
+    """
+    address = request.META.get('REMOTE_ADDR')
+    if not _is_trusted(address):
+        return address
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')
+    for hop in reversed([hop.strip() for hop in forwarded if hop.strip()]):
+        address = hop
+        if not _is_trusted(hop):
+            break
+    return address
+
+
+def client_key(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+    return f'ip:{client_ip(request)}'
+
+
+def check(request, scope):
+    """0, если запрос укладывается в лимит THROTTLE_RATES[scope],
+    иначе через сколько секунд его можно повторить.
+    """
+    rate = settings.THROTTLE_RATES.get(scope)
+    if rate is None:
+        return 0
+    limit, period = parse_rate(rate)
+    return get_buckets().take(
+        f'{scope}:{client_key(request)}', limit, period
+    )
+
+
+def too_many_requests(wait):
+    response = HttpResponse(status=429)
+    response['Retry-After'] = str(math.ceil(wait))
+    return response
+
+
+def throttle(scope, methods=None):
+    """Ограничивает частоту запросов к view от одного пользователя
+    или IP лимитом THROTTLE_RATES[scope]; methods — какие запросы
+    считать (по умолчанию все).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if methods is None or request.method in methods:
+                wait = check(request, scope)
+                if wait:
+                    return too_many_requests(wait)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ThrottleMiddleware:
+    """Общий лимит THROTTLE_RATES['writes'] на изменяющие запросы
+    одного пользователя или IP ко всем view.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method in UNSAFE_METHODS:
+            wait = check(request, 'writes')
+            if wait:
+                return too_many_requests(wait)
+        return self.get_response(request)
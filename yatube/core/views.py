@@ -1,5 +1,9 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
 from django.shortcuts import render
 
+from .caching import stats
+
 
 def page_not_found(request, exception):
     return render(
@@ -20,3 +24,8 @@ def permission_denied(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+@staff_member_required
+def cache_stats(request):
+    return JsonResponse(stats())
@@ -0,0 +1,83 @@
+import re
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.db import connections
+from django.test import RequestFactory
+
+# Ключ WSGI-окружения, а не заголовок: клиент снаружи его не передаст.
+WARMUP_ENVIRON_KEY = 'yatube.cache_warmup'
+
+ACCESS_LOG_RE = re.compile(r'"GET (\S+) HTTP/[\d.]+" 200 ')
+
+Warmed = namedtuple('Warmed', 'url status ms')
+
+
+def is_warmup(request):
+    """Запрос пришёл от прогрева кэша, а не от посетителя."""
+    return bool(request.META.get(WARMUP_ENVIRON_KEY))
+
+
+def urls_from_access_log(lines, limit):
+    """Самые частые успешные GET-запросы из access-лога в формате
+    common/combined, без статики и медиа.
+    """
+    hits = Counter()
+    for line in lines:
+        match = ACCESS_LOG_RE.search(line)
+        if match and not match.group(1).startswith(
+            (settings.STATIC_URL, settings.MEDIA_URL)
+        ):
+            hits[match.group(1)] += 1
+    return [url for url, _ in hits.most_common(limit)]
+
+
+def _host():
+    for host in settings.ALLOWED_HOSTS:
+        if host != '*':
+            return host.lstrip('.')
+    return 'localhost'
+
+
+def _handler():
+    """Обработчик с той же цепочкой middleware, что и у WSGI-приложения,
+    но без тестового клиента: ответы не копируются, сигналы шаблонов
+    не перехватываются, а исключения превращаются в ответы 500.
+    """
+    handler = BaseHandler()
+    handler.load_middleware()
+    return handler
+
+
+def _fetch(handler, url):
+    request = RequestFactory(
+        HTTP_HOST=_host(), **{WARMUP_ENVIRON_KEY: True}
+    ).get(url)
+    started = time.perf_counter()
+    try:
+        status = handler.get_response(request).status_code
+    except Exception as error:
+        status = type(error).__name__
+    return Warmed(url, status, (time.perf_counter() - started) * 1000)
+
+
+def _fetch_in_thread(handler, url):
+    try:
+        return _fetch(handler, url)
+    finally:
+        connections.close_all()
+
+
+def warm(urls, concurrency=1):
+    """Запрашивает urls анонимно не больше чем в concurrency потоках;
+    ответы заполняют кэши страниц, счётчиков и миниатюр.
+    """
+    handler = _handler()
+    if concurrency <= 1:
+        return [_fetch(handler, url) for url in urls]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(partial(_fetch_in_thread, handler), urls))
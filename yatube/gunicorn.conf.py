@@ -0,0 +1,17 @@
+import os
+
+# Импортируем приложение в мастер-процессе до форка: воркеры получают
+# уже загруженные модули и шаблоны (см. core.startup.preload) и делят
+# эти страницы памяти с мастером.
+wsgi_app = 'yatube.wsgi:application'
+preload_app = True
+max_requests = 1000
+max_requests_jitter = 100
+
+# Потоки /live/ большую часть времени простаивают; их отдаёт отдельный
+# экземпляр с GUNICORN_WORKER_CLASS=gevent, где каждое соединение —
+# гринлет, а не поток воркера.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '5000'))
+if worker_class != 'sync':
+    max_requests = 0
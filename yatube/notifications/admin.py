@@ -0,0 +1,17 @@
+from django.contrib import admin
+from .models import Notification
+
+
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'user',
+        'author',
+        'count',
+        'updated',
+    )
+    search_fields = ('user__username', 'author__username')
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(Notification, NotificationAdmin)
@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+from posts.models import Post
+
+User = get_user_model()
+
+
+class Notification(models.Model):
+    """Непрочитанные новые посты одного автора для подписчика.
+
+    Новые посты автора не добавляют строк, а увеличивают count,
+    поэтому очередь пользователя — не больше строки на автора.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Получатель',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор',
+    )
+    count = models.PositiveIntegerField(
+        verbose_name='Новых постов',
+        default=0,
+    )
+    last_post = models.ForeignKey(
+        Post,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        blank=True,
+        null=True,
+        verbose_name='Последний пост',
+    )
+    updated = models.DateTimeField(
+        verbose_name='Дата обновления',
+        auto_now=True,
+    )
+
+    class Meta:
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author',),
+                name='unique_notification'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.user} ← {self.author}: {self.count}'
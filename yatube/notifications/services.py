@@ -0,0 +1,88 @@
+import uuid
+
+from django.core.cache import cache
+from django.db.models import Sum
+
+from core.events import publish
+
+from .models import Notification
+
+
+def version_key(user_id):
+    return f'notifications:version:{user_id}'
+
+
+def live_channel(user_id):
+    return f'notifications:{user_id}'
+
+
+# Версия с этим префиксом значит, что очередь пользователя пуста.
+EMPTY_PREFIX = 'empty:'
+
+
+def bump(*user_ids, empty=False):
+    """Меняет версию очередей, чтобы poll этих пользователей
+    перечитал их, и отправляет версию с числом непрочитанных постов
+    в их SSE-каналы; empty — очереди теперь пусты.
+    """
+    prefix = EMPTY_PREFIX if empty else ''
+    versions = {
+        user_id: prefix + uuid.uuid4().hex for user_id in user_ids
+    }
+    cache.set_many(
+        {
+            version_key(user_id): version
+            for user_id, version in versions.items()
+        },
+        None,
+    )
+    counts = {} if empty else dict(
+        Notification.objects.filter(user_id__in=user_ids).values(
+            'user_id'
+        ).annotate(unread=Sum('count')).values_list('user_id', 'unread')
+    )
+    for user_id, version in versions.items():
+        publish(live_channel(user_id), 'notifications', {
+            'version': version,
+            'unread': counts.get(user_id, 0),
+        })
+
+
+def is_empty(version):
+    return version.startswith(EMPTY_PREFIX)
+
+
+def get_version(user_id):
+    key = version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, None):
+            version = cache.get(key)
+    return version
+
+
+def unread(user):
+    """Очередь пользователя одним запросом, свежие авторы первыми."""
+    return list(
+        Notification.objects.filter(user=user).select_related(
+            'author'
+        ).order_by('-updated')
+    )
+
+
+def mark_read(user):
+    """Очищает очередь; если по версии она уже пуста, база
+    не трогается.
+
+    Уведомление, добавленное после удаления, могло сменить версию
+    раньше, чем очередь помечена пустой, поэтому после пометки
+    очередь проверяется ещё раз.
+    """
+    if is_empty(get_version(user.pk)):
+        return
+    notifications = Notification.objects.filter(user=user)
+    notifications.delete()
+    bump(user.pk, empty=True)
+    if notifications.exists():
+        bump(user.pk)
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.tasks import task
+from posts.models import Follow, Post
+
+from .models import Notification
+from .services import bump
+
+
+@task(priority=-1)
+def notify_followers(post_id):
+    """Добавляет новый пост в очереди подписчиков автора пачками
+    по NOTIFICATIONS_BATCH_SIZE.
+    """
+    post = Post.objects.filter(pk=post_id).only('author').first()
+    if post is None:
+        return
+    followers = list(
+        Follow.objects.filter(author=post.author_id).order_by(
+            'user_id'
+        ).values_list('user_id', flat=True)
+    )
+    size = settings.NOTIFICATIONS_BATCH_SIZE
+    for start in range(0, len(followers), size):
+        batch = followers[start:start + size]
+        with transaction.atomic():
+            Notification.objects.bulk_create(
+                [
+                    Notification(user_id=user_id, author_id=post.author_id)
+                    for user_id in batch
+                ],
+                ignore_conflicts=True,
+            )
+            Notification.objects.filter(
+                user_id__in=batch, author_id=post.author_id
+            ).update(
+                count=F('count') + 1,
+                last_post=post_id,
+                updated=timezone.now(),
+            )
+        bump(*batch)
@@ -0,0 +1,118 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.conf import settings
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.events import get_broker
+from posts.models import Follow, Post
+
+from . import services
+from .models import Notification
+from .services import get_version, is_empty, live_channel, mark_read
+
+User = get_user_model()
+
+
+class NotificationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Andrey')
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.stranger = User.objects.create_user(username='Stranger')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_posts_are_batched_per_author(self):
+        """Новые посты автора копятся в одном уведомлении подписчика."""
+        for _ in range(3):
+            Post.objects.create(author=self.author, text='Текст')
+        notification = Notification.objects.get()
+        self.assertEqual(notification.user, self.reader)
+        self.assertEqual(notification.count, 3)
+        self.assertFalse(self.stranger.notifications.exists())
+
+    def test_poll_reports_unread_until_feed_is_read(self):
+        """poll отдаёт число новых постов, а лента подписок
+        отмечает их прочитанными.
+        """
+        url = reverse('notifications:poll')
+        version = self.reader_client.get(url).json()['version']
+        response = self.reader_client.get(url, {'since': version})
+        self.assertEqual(response.json(), {
+            'version': version,
+            'interval': settings.NOTIFICATIONS_POLL_INTERVAL,
+        })
+        post = Post.objects.create(author=self.author, text='Текст')
+        data = self.reader_client.get(url, {'since': version}).json()
+        self.assertNotEqual(data['version'], version)
+        self.assertEqual(data['unread'], 1)
+        self.assertEqual(data['authors'], [
+            {'username': 'Andrey', 'count': 1, 'last_post': post.pk},
+        ])
+        self.reader_client.get(reverse('posts:follow_index'))
+        data = self.reader_client.get(url, {'since': data['version']}).json()
+        self.assertEqual(data['unread'], 0)
+
+    def test_read_queue_is_not_deleted_again(self):
+        """Пустая по версии очередь не читается и не удаляется."""
+        Post.objects.create(author=self.author, text='Текст')
+        self.reader_client.get(reverse('posts:follow_index'))
+        self.assertFalse(Notification.objects.exists())
+        with self.assertNumQueries(0):
+            mark_read(self.reader)
+        data = self.reader_client.get(reverse('notifications:poll')).json()
+        self.assertEqual(data['unread'], 0)
+
+    def test_unread_count_is_pushed_to_followers(self):
+        """Число новых постов и версия уходят в SSE-канал подписчика."""
+        subscription = get_broker().subscribe({live_channel(self.reader.pk)})
+        try:
+            Post.objects.create(author=self.author, text='Текст')
+            event = subscription.get(0)
+            self.assertEqual(event.name, 'notifications')
+            self.assertEqual(event.data, {
+                'version': get_version(self.reader.pk), 'unread': 1,
+            })
+            self.reader_client.get(reverse('posts:follow_index'))
+            self.assertEqual(subscription.get(0).data['unread'], 0)
+        finally:
+            subscription.close()
+
+    def test_post_added_while_marking_read_is_not_lost(self):
+        """Уведомление, появившееся между удалением очереди и пометкой
+        её пустой, остаётся видно.
+        """
+        Post.objects.create(author=self.author, text='Текст')
+        bump = services.bump
+
+        def bump_after_new_post(*user_ids, empty=False):
+            if empty:
+                Notification.objects.create(
+                    user=self.reader, author=self.author, count=1
+                )
+            bump(*user_ids, empty=empty)
+
+        with mock.patch.object(services, 'bump', bump_after_new_post):
+            mark_read(self.reader)
+        self.assertFalse(is_empty(get_version(self.reader.pk)))
+        data = self.reader_client.get(reverse('notifications:poll')).json()
+        self.assertEqual(data['unread'], 1)
+
+    def test_badge_subscribes_only_with_live_url(self):
+        url = reverse('posts:follow_index')
+        self.assertNotContains(
+            self.reader_client.get(url), 'data-notifications-live'
+        )
+        with override_settings(LIVE_EVENTS_URL='/live/'):
+            response = self.reader_client.get(url)
+        self.assertContains(
+            response, 'data-notifications-live="/live/?notifications=1"'
+        )
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+
+from .services import get_version, is_empty, unread
+
+
+@login_required
+def poll(request):
+    """Отвечает сразу: версия очереди, а если она отличается от since,
+    то и сама очередь. interval — через сколько секунд спросить снова.
+
+    Запрос не держит воркер: пока версия не изменилась, проверяется
+    только кэш, а пустая очередь не читается из базы. С LIVE_EVENTS_URL
+    страница спрашивает только при загрузке, дальше версии и число
+    новых постов приходят в SSE-поток ?notifications=1.
+    """
+    since = request.GET.get('since')
+    version = get_version(request.user.pk)
+    data = {
+        'version': version,
+        'interval': settings.NOTIFICATIONS_POLL_INTERVAL,
+    }
+    if version == since:
+        return JsonResponse(data)
+    notifications = [] if is_empty(version) else unread(request.user)
+    data.update(
+        unread=sum(item.count for item in notifications),
+        authors=[
+            {
+                'username': item.author.username,
+                'count': item.count,
+                'last_post': item.last_post_id,
+            }
+            for item in notifications
+        ],
+    )
+    return JsonResponse(data)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Comment, Group, Post, Follow
+from .models import ArchivedPost, Comment, Group, Post, Follow
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -48,7 +48,22 @@ class CommentAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
+class ArchivedPostAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'text',
+        'pub_date',
+        'author_username',
+        'group_title',
+        'archived',
+    )
+    search_fields = ('text',)
+    list_filter = ('pub_date',)
+    empty_value_display = '-пусто-'
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
 admin.site.register(Follow, FollowAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(ArchivedPost, ArchivedPostAdmin)
@@ -0,0 +1,61 @@
+import json
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Subquery
+
+from .models import GroupAuthorStats, GroupStats, Post
+
+
+def _refresh_top_authors(group_id):
+    usernames = GroupAuthorStats.objects.filter(
+        group_id=group_id
+    ).order_by('-posts_count').values_list('author__username', flat=True)
+    GroupStats.objects.filter(group_id=group_id).update(
+        top_authors=json.dumps(
+            list(usernames[:settings.GROUP_TOP_AUTHORS]), ensure_ascii=False
+        )
+    )
+
+
+def add_post(group_id, author_id, pub_date):
+    with transaction.atomic():
+        stats, _ = GroupStats.objects.get_or_create(group_id=group_id)
+        stats.posts_count = F('posts_count') + 1
+        if stats.last_post_at is None or stats.last_post_at < pub_date:
+            stats.last_post_at = pub_date
+        stats.save(update_fields=('posts_count', 'last_post_at'))
+        author_stats, _ = GroupAuthorStats.objects.get_or_create(
+            group_id=group_id, author_id=author_id
+        )
+        author_stats.posts_count = F('posts_count') + 1
+        author_stats.save(update_fields=('posts_count',))
+        _refresh_top_authors(group_id)
+
+
+def remove_post(group_id, author_id, pub_date):
+    remove_posts(group_id, author_id, [pub_date])
+
+
+def remove_posts(group_id, author_id, pub_dates):
+    """Учитывает удаление постов автора из группы, опубликованных
+    в pub_dates.
+    """
+    with transaction.atomic():
+        GroupStats.objects.filter(group_id=group_id).update(
+            posts_count=F('posts_count') - len(pub_dates)
+        )
+        GroupStats.objects.filter(
+            group_id=group_id, last_post_at__in=pub_dates
+        ).update(last_post_at=Subquery(
+            Post.objects.filter(
+                group_id=group_id
+            ).order_by('-pub_date').values('pub_date')[:1]
+        ))
+        GroupAuthorStats.objects.filter(
+            group_id=group_id, author_id=author_id
+        ).update(posts_count=F('posts_count') - len(pub_dates))
+        GroupAuthorStats.objects.filter(
+            group_id=group_id, posts_count=0
+        ).delete()
+        _refresh_top_authors(group_id)
@@ -0,0 +1,67 @@
+import json
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .deletion import delete_posts
+from .models import ArchivedPost, Comment, Post
+
+
+def _archived(post, comments):
+    return ArchivedPost(
+        id=post.pk,
+        text=post.text,
+        pub_date=post.pub_date,
+        author_id=post.author_id,
+        author_username=post.author.username,
+        group_slug=post.group.slug if post.group else '',
+        group_title=post.group.title if post.group else '',
+        image=post.image.name or '',
+        views=post.views,
+        comments=json.dumps([
+            {
+                'author': {'username': comment.author.username},
+                'text': comment.text,
+                'created': comment.created.isoformat(),
+            }
+            for comment in comments
+        ]),
+    )
+
+
+def archive_batch(cutoff, size):
+    """Переносит в архив до size постов старше cutoff.
+
+    Сначала пишется архив, потом удаляются горячие строки: после сбоя
+    между шагами пост останется в обеих таблицах, и следующий запуск
+    просто удалит его из горячей. Возвращает число перенесённых постов.
+    """
+    posts = list(
+        Post.objects.filter(pub_date__lt=cutoff).select_related(
+            'author', 'group'
+        ).order_by('pub_date')[:size]
+    )
+    if not posts:
+        return 0
+    comments = {}
+    for comment in Comment.objects.filter(
+        post__in=posts
+    ).select_related('author').order_by('created'):
+        comments.setdefault(comment.post_id, []).append(comment)
+    ArchivedPost.objects.bulk_create(
+        [_archived(post, comments.get(post.pk, ())) for post in posts],
+        ignore_conflicts=True,
+    )
+    delete_posts(posts)
+    return len(posts)
+
+
+def archive_posts(days, size):
+    """Переносит в архив все посты старше days дней пачками по size."""
+    cutoff = timezone.now() - timedelta(days=days)
+    total = 0
+    while True:
+        moved = archive_batch(cutoff, size)
+        if not moved:
+            return total
+        total += moved
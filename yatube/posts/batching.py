@@ -0,0 +1,148 @@
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+class CommentNotSaved(Exception):
+    """Запись комментария не подтверждена: она не удалась или не
+    уложилась в COMMENT_BATCH_TIMEOUT.
+    """
+
+
+class CommentWriteQueue:
+    """Собирает комментарии из разных запросов и пишет их пачками.
+
+    Все комментарии пачки сохраняются в одной транзакции, поэтому на
+    SQLite один fsync приходится на всю пачку, а не на каждую запись.
+    submit() возвращает Future, который завершается только после
+    коммита транзакции с этим комментарием.
+    """
+
+    def __init__(self, interval, max_batch):
+        self.interval = interval
+        self.max_batch = max_batch
+        self._pending = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def submit(self, comment):
+        future = Future()
+        with self._lock:
+            self._pending.append((comment, future))
+            if len(self._pending) >= self.max_batch:
+                self._wakeup.set()
+        return future
+
+    def withdraw(self, future):
+        """Снимает комментарий с очереди, если его пачка ещё не начала
+        записываться. False значит, что запись уже идёт.
+        """
+        with self._lock:
+            for index, (comment, pending) in enumerate(self._pending):
+                if pending is future:
+                    del self._pending[index]
+                    return True
+        return False
+
+    def flush(self):
+        with self._lock:
+            batch = self._pending[:self.max_batch]
+            self._pending = self._pending[self.max_batch:]
+        if not batch:
+            return 0
+        results = []
+        try:
+            with transaction.atomic():
+                for comment, future in batch:
+                    try:
+                        with transaction.atomic():
+                            comment.save()
+                    except Exception as error:
+                        results.append((future, None, error))
+                    else:
+                        results.append((future, comment, None))
+        except Exception as error:
+            for comment, future in batch:
+                future.set_exception(error)
+            return 0
+        for future, comment, error in results:
+            if error is None:
+                future.set_result(comment)
+            else:
+                future.set_exception(error)
+        return len(batch)
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name='comment-writer', daemon=True
+        )
+        self._thread.start()
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                while self.flush():
+                    pass
+                close_old_connections()
+            except Exception:
+                logger.exception('Не удалось записать пачку комментариев')
+
+
+def get_comment_queue():
+    """Очередь процесса; её поток запускается заново, если он
+    остановился, например после форка воркера.
+    """
+    global _queue
+    if _queue is None or not _queue.is_alive():
+        with _queue_lock:
+            if _queue is None:
+                _queue = CommentWriteQueue(
+                    settings.COMMENT_BATCH_INTERVAL,
+                    settings.COMMENT_BATCH_SIZE,
+                )
+            if not _queue.is_alive():
+                _queue.start()
+    return _queue
+
+
+def _wait(queue, future):
+    timeout = settings.COMMENT_BATCH_TIMEOUT
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        if queue.withdraw(future):
+            raise CommentNotSaved
+    # Пачка с комментарием уже в транзакции: ждём её коммита ещё
+    # столько же, но не дольше.
+    return future.result(timeout=timeout)
+
+
+def save_comment(comment):
+    """Сохраняет комментарий; CommentNotSaved значит, что запись не
+    подтверждена и запрос можно повторить.
+    """
+    if not settings.COMMENT_WRITE_BATCHING:
+        comment.save()
+        return comment
+    queue = get_comment_queue()
+    future = queue.submit(comment)
+    try:
+        return _wait(queue, future)
+    except CommentNotSaved:
+        raise
+    except Exception as error:
+        raise CommentNotSaved from error
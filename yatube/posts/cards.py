@@ -0,0 +1,113 @@
+from django.db.models import Model
+from django.db.models.query import BaseIterable, ValuesIterable
+
+CARD_FIELDS = (
+    'id', 'excerpt', 'excerpt_truncated', 'pub_date', 'image', 'views',
+    'author_id', 'author__username',
+    'group_id', 'group__slug', 'group__title',
+)
+
+
+class AuthorCard:
+    __slots__ = ('id', 'username')
+
+    def __init__(self, id, username):
+        self.id = id
+        self.username = username
+
+    def __str__(self):
+        return self.username
+
+
+class GroupCard:
+    __slots__ = ('id', 'slug', 'title')
+
+    def __init__(self, id, slug, title):
+        self.id = id
+        self.slug = slug
+        self.title = title
+
+    def __str__(self):
+        return self.title
+
+
+class PostCard:
+    """Карточка поста для лент и API: поля шаблона карточки
+    и сохранённая выдержка вместо полного текста.
+
+    Равна посту и карточке с тем же id.
+    """
+    __slots__ = (
+        'id', 'text', 'truncated', 'pub_date', 'image', 'views',
+        'author', 'group',
+    )
+
+    def __init__(self, id, text, truncated, pub_date, image, views,
+                 author, group):
+        self.id = id
+        self.text = text
+        self.truncated = truncated
+        self.pub_date = pub_date
+        self.image = image
+        self.views = views
+        self.author = author
+        self.group = group
+
+    @property
+    def pk(self):
+        return self.id
+
+    @property
+    def author_id(self):
+        return self.author.id
+
+    @property
+    def group_id(self):
+        return self.group and self.group.id
+
+    def __eq__(self, other):
+        if isinstance(other, PostCard):
+            return other.id == self.id
+        if isinstance(other, Model):
+            return other._meta.label == 'posts.Post' and other.pk == self.id
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __str__(self):
+        return self.text[:15]
+
+    def as_dict(self):
+        return {
+            'id': self.id,
+            'text': self.text,
+            'truncated': self.truncated,
+            'pub_date': self.pub_date,
+            'image': self.image,
+            'views': self.views,
+            'author': self.author.username,
+            'group': self.group and self.group.slug,
+        }
+
+
+class PostCardIterable(BaseIterable):
+    """Строит PostCard из строк queryset.values(*CARD_FIELDS)."""
+
+    def __iter__(self):
+        for row in ValuesIterable(self.queryset):
+            group = None
+            if row['group_id'] is not None:
+                group = GroupCard(
+                    row['group_id'], row['group__slug'], row['group__title']
+                )
+            yield PostCard(
+                row['id'],
+                row['excerpt'],
+                row['excerpt_truncated'],
+                row['pub_date'],
+                row['image'],
+                row['views'],
+                AuthorCard(row['author_id'], row['author__username']),
+                group,
+            )
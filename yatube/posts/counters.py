@@ -0,0 +1,220 @@
+import fcntl
+import glob
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from . import ranking
+from .hyperloglog import HyperLogLog
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+_counter = None
+_counter_lock = threading.Lock()
+
+
+def unique_key(post_id):
+    return f'views:unique:{post_id}'
+
+
+def total_key(post_id):
+    return f'views:total:{post_id}'
+
+
+class ViewCounter:
+    """Копит просмотры постов в памяти процесса и периодически пишет
+    их в базу пачкой UPDATE ... SET views = views + n.
+
+    Запись запускается сигналом request_finished не чаще раза в
+    flush_interval секунд, то есть уже после отправки ответа.
+
+    Каждый просмотр сразу дописывается строкой в журнал процесса в
+    VIEW_COUNTER_JOURNAL_DIR; при записи пачки журнал сменяется новым,
+    а старый удаляется после коммита. Журнал держится под flock, пока
+    процесс жив, поэтому журналы упавших процессов узнаются по
+    свободной блокировке, а не по PID, и применяются следующим
+    счётчиком. Просмотры теряются, только если упала вся машина до
+    сброса страниц на диск; гарантия — «хотя бы один раз»: при падении
+    между коммитом и удалением журнала пачка будет учтена повторно.
+    """
+
+    def __init__(self, journal_dir, flush_interval, track_unique=False):
+        self.journal_dir = journal_dir
+        self.flush_interval = flush_interval
+        self.track_unique = track_unique
+        self._pending = Counter()
+        self._unique = {}
+        # Журналы, чьи просмотры сейчас в _pending: (путь, дескриптор).
+        self._journals = []
+        self._journal = None
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._recovered = False
+
+    def _open_journal(self):
+        os.makedirs(self.journal_dir, exist_ok=True)
+        path = os.path.join(self.journal_dir, f'views-{uuid.uuid4().hex}.log')
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return path, fd
+
+    def hit(self, post_id, viewer=None):
+        with self._lock:
+            if self._pid != os.getpid():
+                # После форка журналы и просмотры остаются родителю.
+                self._pid = os.getpid()
+                self._pending, self._unique = Counter(), {}
+                self._journals, self._journal = [], None
+            if self._journal is None:
+                self._journal = self._open_journal()
+                self._journals.append(self._journal)
+            os.write(self._journal[1], f'{post_id}\n'.encode())
+            self._pending[post_id] += 1
+            if self.track_unique and viewer is not None:
+                if post_id not in self._unique:
+                    self._unique[post_id] = HyperLogLog()
+                self._unique[post_id].add(viewer)
+
+    def pending(self, post_id):
+        return self._pending.get(post_id, 0)
+
+    def unique_viewers(self, post_id):
+        registers = cache.get(unique_key(post_id))
+        estimate = HyperLogLog(registers=registers)
+        local = self._unique.get(post_id)
+        if local is not None:
+            estimate.merge(local)
+        return estimate.count()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, Counter()
+                unique, self._unique = self._unique, {}
+                journals, self._journals = self._journals, []
+                self._journal = None
+            if batch:
+                try:
+                    self._apply(batch)
+                except Exception:
+                    with self._lock:
+                        self._pending.update(batch)
+                        self._journals[:0] = journals
+                    raise
+            for path, fd in journals:
+                os.remove(path)
+                os.close(fd)
+            if batch:
+                self._applied(batch)
+            for post_id, local in unique.items():
+                key = unique_key(post_id)
+                stored = HyperLogLog(registers=cache.get(key))
+                stored.merge(local)
+                cache.set(key, bytes(stored.registers), None)
+            return len(batch)
+
+    def recover(self):
+        """Применяет журналы, которые не держит ни один живой процесс."""
+        pattern = os.path.join(self.journal_dir, 'views-*.log')
+        for path in glob.glob(pattern):
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue
+                if os.fstat(fd).st_nlink == 0:
+                    continue
+                with os.fdopen(os.dup(fd)) as journal:
+                    # Недописанная при падении строка не учитывается.
+                    batch = Counter(
+                        int(line) for line in journal
+                        if line.endswith('\n') and line[:-1].isdigit()
+                    )
+                if batch:
+                    self._apply(batch)
+                os.remove(path)
+            finally:
+                os.close(fd)
+            if batch:
+                self._applied(batch)
+
+    def _apply(self, batch):
+        with transaction.atomic():
+            for post_id, views in batch.items():
+                Post.objects.filter(pk=post_id).update(
+                    views=F('views') + views
+                )
+
+    def stored_views(self, post_ids):
+        """Записанные в базу просмотры постов; кэшируются до следующей
+        записи пачки.
+        """
+        cached = cache.get_many([total_key(post_id) for post_id in post_ids])
+        views = {
+            post_id: cached[total_key(post_id)]
+            for post_id in post_ids if total_key(post_id) in cached
+        }
+        missing = set(post_ids) - set(views)
+        if missing:
+            loaded = dict(
+                Post.objects.filter(pk__in=missing).values_list('id', 'views')
+            )
+            cache.set_many({
+                total_key(post_id): total
+                for post_id, total in loaded.items()
+            }, None)
+            views.update(loaded)
+        return views
+
+    def _applied(self, batch):
+        # Просмотры уже записаны: ошибку здесь нельзя исправлять повторной
+        # записью пачки, иначе просмотры посчитаются дважды.
+        try:
+            cache.delete_many([total_key(post_id) for post_id in batch])
+            weight = settings.RANKING_WEIGHTS['view']
+            posts = Post.objects.filter(pk__in=batch).only('id', 'group')
+            for post in posts:
+                ranking.record(post, weight * batch[post.pk])
+        except Exception:
+            logger.exception('Не удалось обновить кэш и рейтинг просмотров')
+
+    def flush_if_due(self):
+        now = time.monotonic()
+        if now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        try:
+            if not self._recovered:
+                self._recovered = True
+                self.recover()
+            self.flush()
+        except Exception:
+            logger.exception('Не удалось записать просмотры')
+
+
+def get_view_counter(create=True):
+    global _counter
+    if _counter is None and create:
+        with _counter_lock:
+            if _counter is None:
+                _counter = ViewCounter(
+                    settings.VIEW_COUNTER_JOURNAL_DIR,
+                    settings.VIEW_COUNTER_FLUSH_INTERVAL,
+                    settings.VIEW_COUNTER_UNIQUE,
+                )
+    return _counter
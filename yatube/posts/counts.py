@@ -0,0 +1,77 @@
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Sum
+
+from .models import Follow, GroupStats, Post, ScopeCount
+
+
+def _add(kind, object_id, delta):
+    updated = ScopeCount.objects.filter(
+        kind=kind, object_id=object_id
+    ).update(count=F('count') + delta)
+    if updated:
+        return
+    posts = Post.objects.all()
+    if kind == ScopeCount.AUTHOR:
+        posts = posts.filter(author=object_id)
+    try:
+        with transaction.atomic():
+            ScopeCount.objects.create(
+                kind=kind, object_id=object_id, count=posts.count()
+            )
+    except IntegrityError:
+        pass
+
+
+def add_post(author_id, delta):
+    _add(ScopeCount.SITE, 0, delta)
+    _add(ScopeCount.AUTHOR, author_id, delta)
+
+
+def remove_author(author_id):
+    ScopeCount.objects.filter(
+        kind=ScopeCount.AUTHOR, object_id=author_id
+    ).delete()
+
+
+def planner_estimate(model):
+    """Оценка числа строк таблицы из статистики планировщика PostgreSQL."""
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def site_count():
+    count = ScopeCount.objects.filter(
+        kind=ScopeCount.SITE
+    ).values_list('count', flat=True).first()
+    if count is None:
+        return planner_estimate(Post)
+    return count
+
+
+def author_count(author_id):
+    return ScopeCount.objects.filter(
+        kind=ScopeCount.AUTHOR, object_id=author_id
+    ).values_list('count', flat=True).first()
+
+
+def group_count(group_id):
+    return GroupStats.objects.filter(
+        group=group_id
+    ).values_list('posts_count', flat=True).first()
+
+
+def feed_count(user):
+    """Число постов в ленте подписок: сумма счётчиков её авторов."""
+    return ScopeCount.objects.filter(
+        kind=ScopeCount.AUTHOR,
+        object_id__in=Follow.objects.filter(user=user).values('author_id'),
+    ).aggregate(total=Sum('count'))['total']
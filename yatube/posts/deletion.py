@@ -0,0 +1,53 @@
+from collections import Counter, defaultdict
+
+from django.db import router, transaction
+from django.db.models.deletion import Collector
+
+from core.page_cache import bump
+
+from . import aggregates, counts, profiles
+
+
+def _collector(objects):
+    collector = Collector(using=router.db_for_write(type(objects[0])))
+    collector.collect(objects)
+    return collector
+
+
+def delete_objects(objects):
+    """Удаляет уже загруженные объекты одной модели в одной транзакции.
+
+    Сигналы удаления получают эти же объекты, поэтому связи, выбранные
+    через select_related, не запрашиваются заново для каждого.
+    """
+    collector = _collector(objects)
+    with transaction.atomic(using=collector.using):
+        collector.delete()
+
+
+def delete_posts(posts):
+    """Удаляет пачку постов, загруженных с select_related('author',
+    'group').
+
+    Счётчики постов, статистика групп и кэш страниц правятся один раз
+    на пачку, а не сигналами post_delete на каждый пост.
+    """
+    collector = _collector(posts)
+    authors = Counter()
+    groups = defaultdict(list)
+    tags = set()
+    for post in posts:
+        post.bulk_deleted = True
+        authors[post.author_id] += 1
+        tags.update((f'post:{post.pk}', f'author:{post.author.username}'))
+        if post.group_id is not None:
+            groups[post.group_id, post.author_id].append(post.pub_date)
+            tags.add(f'group:{post.group.slug}')
+    with transaction.atomic(using=collector.using):
+        collector.delete()
+        for author_id, deleted in authors.items():
+            counts.add_post(author_id, -deleted)
+        for (group_id, author_id), pub_dates in groups.items():
+            aggregates.remove_posts(group_id, author_id, pub_dates)
+    profiles.invalidate(*{post.author.username for post in posts})
+    bump(*tags)
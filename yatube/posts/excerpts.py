@@ -0,0 +1,28 @@
+import re
+
+from django.conf import settings
+from django.utils.html import strip_tags
+
+PARAGRAPH_RE = re.compile(r'\n\s*\n')
+
+
+def make_excerpt(text):
+    """Начало текста для карточки: первые POST_EXCERPT_PARAGRAPHS абзацев,
+    не длиннее POST_EXCERPT_LENGTH символов и без HTML-тегов.
+
+    Возвращает пару (выдержка, обрезан ли текст).
+    """
+    paragraphs = [
+        ' '.join(paragraph.split())
+        for paragraph in PARAGRAPH_RE.split(strip_tags(text))
+        if paragraph.strip()
+    ]
+    full = '\n\n'.join(paragraphs)
+    excerpt = '\n\n'.join(paragraphs[:settings.POST_EXCERPT_PARAGRAPHS])
+    length = settings.POST_EXCERPT_LENGTH
+    if len(excerpt) > length:
+        excerpt = excerpt[:length + 1]
+        cut = excerpt.rsplit(None, 1)[0]
+        excerpt = cut if cut != excerpt else excerpt[:length]
+        excerpt = excerpt.rstrip()
+    return excerpt, excerpt != full
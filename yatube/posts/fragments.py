@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.template.loader import render_to_string
+
+from core.page_cache import fragment
+
+from .counters import get_view_counter
+from .forms import CommentForm
+from .models import User, authors_with_follow_state
+
+
+@fragment('follow_button')
+def follow_button(request, params_list):
+    viewer = request.user
+    if not viewer.is_authenticated:
+        return ['' for _ in params_list]
+    authors = authors_with_follow_state(
+        User.objects.filter(
+            pk__in={int(params['author_id']) for params in params_list}
+        ).only('id'),
+        viewer,
+    )
+    followed = {
+        author.pk for author in authors if author.is_followed_by_viewer
+    }
+    return [
+        render_to_string('posts/includes/follow_button.html', {
+            'username': params['username'],
+            'size': params.get('size', 'sm'),
+            'is_followed': int(params['author_id']) in followed,
+        }, request=request)
+        if int(params['author_id']) != viewer.pk
+        else ''
+        for params in params_list
+    ]
+
+
+@fragment('post_actions')
+def post_actions(request, params_list):
+    return [
+        render_to_string('posts/includes/post_actions.html', {
+            'post_id': int(params['post_id']),
+            'author_id': int(params['author_id']),
+            'form': CommentForm(),
+        }, request=request)
+        for params in params_list
+    ]
+
+
+@fragment('switcher')
+def switcher(request, params_list):
+    return [
+        render_to_string(
+            'posts/includes/switcher.html', params, request=request
+        )
+        for params in params_list
+    ]
+
+
+@fragment('post_views')
+def post_views(request, params_list):
+    """Счётчики просмотров не хранятся в общей копии страницы, поэтому
+    запись просмотров не сбрасывает её.
+    """
+    counter = get_view_counter()
+    post_ids = [int(params['post_id']) for params in params_list]
+    stored = counter.stored_views(post_ids)
+    return [
+        render_to_string('posts/includes/post_views.html', {
+            'views': stored.get(post_id, 0) + counter.pending(post_id),
+            'unique_viewers': (
+                counter.unique_viewers(post_id)
+                if settings.VIEW_COUNTER_UNIQUE else None
+            ),
+        })
+        for post_id in post_ids
+    ]
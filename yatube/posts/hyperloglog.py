@@ -0,0 +1,35 @@
+import hashlib
+import math
+
+
+class HyperLogLog:
+    """Оценка числа уникальных значений в 2 ** precision байтах."""
+
+    def __init__(self, precision=10, registers=None):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(registers or self.size)
+
+    def add(self, value):
+        digest = hashlib.blake2b(str(value).encode(), digest_size=8).digest()
+        hash = int.from_bytes(digest, 'big')
+        index = hash >> (64 - self.precision)
+        rest = hash & ((1 << (64 - self.precision)) - 1)
+        rank = 64 - self.precision - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        for index, rank in enumerate(other.registers):
+            if rank > self.registers[index]:
+                self.registers[index] = rank
+
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size ** 2 / sum(
+            2.0 ** -rank for rank in self.registers
+        )
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.size and zeros:
+            estimate = self.size * math.log(self.size / zeros)
+        return round(estimate)
@@ -0,0 +1,32 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.archive import archive_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит старые посты вместе с комментариями в архив, '
+        'чтобы ленты и индексы работали с небольшой горячей таблицей.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ARCHIVE_AFTER_DAYS,
+            help='Архивировать посты старше стольких дней.',
+        )
+        parser.add_argument(
+            '--batch', type=int, default=settings.ARCHIVE_BATCH_SIZE,
+            help='Сколько постов переносить за одну транзакцию.',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        moved = archive_posts(options['days'], options['batch'])
+        elapsed = time.perf_counter() - started
+        if options['verbosity']:
+            self.stdout.write(
+                f'Перенесено в архив постов: {moved}, за {elapsed:.2f} с'
+            )
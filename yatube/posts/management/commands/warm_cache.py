@@ -0,0 +1,52 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.warmup import urls_from_access_log, warm
+from posts.warmup import popular_urls
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет кэши страниц, счётчиков и миниатюр, запрашивая '
+        'популярные адреса до того, как воркер начнёт принимать трафик.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=settings.WARM_CACHE_LIMIT,
+            help='Сколько групп, авторов и постов прогреть '
+                 '(или адресов из лога).',
+        )
+        parser.add_argument(
+            '--concurrency', type=int,
+            default=settings.WARM_CACHE_CONCURRENCY,
+            help='Сколько запросов выполнять одновременно.',
+        )
+        parser.add_argument(
+            '--access-log',
+            help='Брать самые частые адреса из access-лога, а не из '
+                 'популярности постов, групп и авторов.',
+        )
+
+    def handle(self, *args, **options):
+        if options['access_log']:
+            with open(options['access_log']) as log:
+                urls = urls_from_access_log(log, options['limit'])
+        else:
+            urls = popular_urls(options['limit'])
+        started = time.perf_counter()
+        results = warm(urls, options['concurrency'])
+        elapsed = time.perf_counter() - started
+        if not options['verbosity']:
+            return
+        for result in results:
+            self.stdout.write(
+                f'{result.status!s:>5} {result.ms:8.1f} мс  {result.url}',
+            )
+        failed = sum(result.status != 200 for result in results)
+        self.stdout.write(
+            f'Прогрето адресов: {len(results) - failed}, ошибок: {failed}, '
+            f'за {elapsed:.2f} с'
+        )
@@ -0,0 +1,39 @@
+# Generated by Django 2.2.16 on 2026-10-19 12:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostRank',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rank', serialize=False, to='posts.Post')),
+                ('hot', models.FloatField(default=0)),
+                ('trending', models.FloatField(default=0)),
+                ('group', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='posts.Group')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='postrank',
+            index=models.Index(fields=['-hot'], name='rank_hot'),
+        ),
+        migrations.AddIndex(
+            model_name='postrank',
+            index=models.Index(fields=['-trending'], name='rank_trending'),
+        ),
+        migrations.AddIndex(
+            model_name='postrank',
+            index=models.Index(fields=['group', '-hot'], name='rank_group_hot'),
+        ),
+        migrations.AddIndex(
+            model_name='postrank',
+            index=models.Index(fields=['group', '-trending'], name='rank_group_trending'),
+        ),
+    ]
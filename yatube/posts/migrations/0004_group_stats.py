@@ -0,0 +1,95 @@
+# Generated by Django 2.2.16 on 2026-10-19 12:22
+
+import json
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+import django.db.models.deletion
+
+
+def fill_group_stats(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    GroupAuthorStats = apps.get_model('posts', 'GroupAuthorStats')
+    for group in Group.objects.all():
+        posts = Post.objects.filter(group=group)
+        authors = posts.values('author').annotate(
+            posts_count=Count('id')
+        ).order_by('-posts_count')
+        GroupAuthorStats.objects.bulk_create(
+            GroupAuthorStats(
+                group=group,
+                author_id=row['author'],
+                posts_count=row['posts_count'],
+            )
+            for row in authors
+        )
+        GroupStats.objects.create(
+            group=group,
+            posts_count=posts.count(),
+            last_post_at=posts.aggregate(last=Max('pub_date'))['last'],
+            top_authors=json.dumps(
+                list(
+                    GroupAuthorStats.objects.filter(group=group).order_by(
+                        '-posts_count'
+                    ).values_list('author__username', flat=True)[:3]
+                ),
+                ensure_ascii=False,
+            ),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0003_post_views'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupAuthorStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.Group')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Число постов')),
+                ('last_post_at', models.DateTimeField(blank=True, null=True, verbose_name='Последний пост')),
+                ('top_authors', models.TextField(default='[]', help_text='JSON-список имён пользователей', verbose_name='Самые активные авторы')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='groupstats',
+            index=models.Index(fields=['-last_post_at'], name='group_activity'),
+        ),
+        migrations.AddIndex(
+            model_name='groupstats',
+            index=models.Index(fields=['-posts_count'], name='group_posts_count'),
+        ),
+        migrations.AddField(
+            model_name='groupauthorstats',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='groupauthorstats',
+            name='group',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='posts.Group'),
+        ),
+        migrations.AddIndex(
+            model_name='groupauthorstats',
+            index=models.Index(fields=['group', '-posts_count'], name='group_top_authors'),
+        ),
+        migrations.AddConstraint(
+            model_name='groupauthorstats',
+            constraint=models.UniqueConstraint(fields=('group', 'author'), name='unique_group_author'),
+        ),
+        migrations.RunPython(fill_group_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 2.2.16 on 2026-10-19 12:34
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_scope_counts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    ScopeCount = apps.get_model('posts', 'ScopeCount')
+    ScopeCount.objects.create(kind='site', count=Post.objects.count())
+    ScopeCount.objects.bulk_create(
+        ScopeCount(kind='author', object_id=row['author'], count=row['count'])
+        for row in Post.objects.values('author').annotate(
+            count=Count('id')
+        ).order_by()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_group_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScopeCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('site', 'Весь сайт'), ('author', 'Автор')], max_length=10, verbose_name='Область')),
+                ('object_id', models.PositiveIntegerField(default=0, verbose_name='ID объекта области')),
+                ('count', models.IntegerField(default=0, verbose_name='Число постов')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='scopecount',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_scope'),
+        ),
+        migrations.RunPython(fill_scope_counts, migrations.RunPython.noop),
+    ]
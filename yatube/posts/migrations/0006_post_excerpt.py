@@ -0,0 +1,60 @@
+# Generated by Django 2.2.16 on 2026-10-19 12:38
+
+import re
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+
+EXCERPT_LENGTH = 500
+EXCERPT_PARAGRAPHS = 3
+PARAGRAPH_RE = re.compile(r'\n\s*\n')
+
+
+def make_excerpt(text):
+    """Копия posts.excerpts.make_excerpt на момент миграции."""
+    paragraphs = [
+        ' '.join(paragraph.split())
+        for paragraph in PARAGRAPH_RE.split(strip_tags(text))
+        if paragraph.strip()
+    ]
+    full = '\n\n'.join(paragraphs)
+    excerpt = '\n\n'.join(paragraphs[:EXCERPT_PARAGRAPHS])
+    if len(excerpt) > EXCERPT_LENGTH:
+        excerpt = excerpt[:EXCERPT_LENGTH + 1]
+        cut = excerpt.rsplit(None, 1)[0]
+        excerpt = cut if cut != excerpt else excerpt[:EXCERPT_LENGTH]
+        excerpt = excerpt.rstrip()
+    return excerpt, excerpt != full
+
+
+def fill_excerpts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    batch = []
+    for post in Post.objects.only('id', 'text').iterator(chunk_size=500):
+        post.excerpt, post.excerpt_truncated = make_excerpt(post.text)
+        batch.append(post)
+        if len(batch) == 500:
+            Post.objects.bulk_update(batch, ['excerpt', 'excerpt_truncated'])
+            batch = []
+    Post.objects.bulk_update(batch, ['excerpt', 'excerpt_truncated'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_scope_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, help_text='Начало текста для лент, обновляется при сохранении', verbose_name='Выдержка'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='excerpt_truncated',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Текст длиннее выдержки'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 2.2.16 on 2026-10-19 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPost',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('text', models.TextField(verbose_name='Текст поста')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата публикации')),
+                ('archived', models.DateTimeField(auto_now_add=True, verbose_name='Дата переноса в архив')),
+                ('author_id', models.IntegerField(db_index=True, verbose_name='ID автора')),
+                ('author_username', models.CharField(max_length=150, verbose_name='Автор поста')),
+                ('group_slug', models.SlugField(blank=True, max_length=200, verbose_name='Адрес группы')),
+                ('group_title', models.CharField(blank=True, max_length=200, verbose_name='Группа')),
+                ('image', models.CharField(blank=True, max_length=100, verbose_name='Картинка')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='Просмотры')),
+                ('comments', models.TextField(default='[]', verbose_name='Комментарии (JSON)')),
+            ],
+            options={
+                'verbose_name': 'Пост в архиве',
+                'verbose_name_plural': 'Архив постов',
+            },
+        ),
+    ]
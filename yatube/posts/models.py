@@ -1,9 +1,58 @@
+import json
+
 from django.db import models
+from django.db.models.query import ModelIterable
 from django.contrib.auth import get_user_model
 
+from .cards import CARD_FIELDS, PostCardIterable
+from .excerpts import make_excerpt
+
 User = get_user_model()
 
 
+def followed_by(viewer, author_ref='pk'):
+    """Выражение «viewer подписан на автора» для annotate()."""
+    if not viewer.is_authenticated:
+        return models.Value(False, output_field=models.BooleanField())
+    return models.Exists(
+        Follow.objects.filter(user=viewer, author=models.OuterRef(author_ref))
+    )
+
+
+def authors_with_follow_state(users, viewer):
+    """Проставляет user.is_followed_by_viewer пользователям выборки
+    users в том же запросе.
+    """
+    return users.annotate(is_followed_by_viewer=followed_by(viewer))
+
+
+class FollowStateIterable(ModelIterable):
+    def __iter__(self):
+        for post in super().__iter__():
+            post.author.is_followed_by_viewer = post.author_is_followed
+            yield post
+
+
+class PostQuerySet(models.QuerySet):
+    def with_follow_state(self, viewer):
+        """Проставляет post.author.is_followed_by_viewer всем постам
+        выборки в том же запросе.
+        """
+        queryset = self.select_related('author').annotate(
+            author_is_followed=followed_by(viewer, 'author')
+        )
+        queryset._iterable_class = FollowStateIterable
+        return queryset
+
+    def cards(self):
+        """Выборка лёгких PostCard вместо моделей: только поля карточки
+        и выдержка вместо полного текста.
+        """
+        queryset = self.values(*CARD_FIELDS)
+        queryset._iterable_class = PostCardIterable
+        return queryset
+
+
 class Group(models.Model):
     title = models.CharField(
         verbose_name='Название группы',
@@ -33,6 +82,17 @@ class Post(models.Model):
         verbose_name='Текст поста',
         help_text='Текст нового поста'
     )
+    excerpt = models.TextField(
+        verbose_name='Выдержка',
+        blank=True,
+        editable=False,
+        help_text='Начало текста для лент, обновляется при сохранении'
+    )
+    excerpt_truncated = models.BooleanField(
+        verbose_name='Текст длиннее выдержки',
+        default=False,
+        editable=False,
+    )
     pub_date = models.DateTimeField(
         verbose_name='Дата публикации',
         auto_now_add=True,
@@ -62,6 +122,13 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True,
     )
+    views = models.PositiveIntegerField(
+        verbose_name='Просмотры',
+        default=0,
+        editable=False,
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date',)
@@ -69,6 +136,162 @@ class Post(models.Model):
     def __str__(self):
         return self.text[:15]
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'text' in update_fields:
+            self.excerpt, self.excerpt_truncated = make_excerpt(self.text)
+            if update_fields is not None:
+                kwargs['update_fields'] = {
+                    *update_fields, 'excerpt', 'excerpt_truncated'
+                }
+        super().save(*args, **kwargs)
+
+
+class GroupStats(models.Model):
+    """Агрегаты группы для каталога, обновляются сигналами постов."""
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    posts_count = models.PositiveIntegerField(
+        verbose_name='Число постов',
+        default=0,
+    )
+    last_post_at = models.DateTimeField(
+        verbose_name='Последний пост',
+        blank=True,
+        null=True,
+    )
+    top_authors = models.TextField(
+        verbose_name='Самые активные авторы',
+        default='[]',
+        help_text='JSON-список имён пользователей',
+    )
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('-last_post_at',), name='group_activity'),
+            models.Index(fields=('-posts_count',), name='group_posts_count'),
+        )
+
+    def __str__(self):
+        return f'{self.group}: {self.posts_count}'
+
+    @property
+    def top_authors_list(self):
+        return json.loads(self.top_authors)
+
+
+class GroupAuthorStats(models.Model):
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False,
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('group', 'author',),
+                name='unique_group_author'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('group', '-posts_count'), name='group_top_authors'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.author} в {self.group}: {self.posts_count}'
+
+
+class ScopeCount(models.Model):
+    """Число постов области: всего сайта или одного автора.
+
+    Обновляется сигналами постов, чтобы пагинатору не нужен был
+    COUNT(*) по таблице постов.
+    """
+    SITE = 'site'
+    AUTHOR = 'author'
+    KINDS = (
+        (SITE, 'Весь сайт'),
+        (AUTHOR, 'Автор'),
+    )
+    kind = models.CharField(
+        verbose_name='Область',
+        max_length=10,
+        choices=KINDS,
+    )
+    object_id = models.PositiveIntegerField(
+        verbose_name='ID объекта области',
+        default=0,
+    )
+    count = models.IntegerField(
+        verbose_name='Число постов',
+        default=0,
+    )
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('kind', 'object_id',),
+                name='unique_scope'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.kind}:{self.object_id}: {self.count}'
+
+
+class PostRank(models.Model):
+    """Затухающие во времени оценки поста для вкладок «Горячее»
+    и «В тренде».
+
+    Оценка хранится как log2 суммы весов событий, каждый из которых
+    умножен на 2 ** ((t - RANKING_EPOCH) / half_life). Так оценки разных
+    постов сравнимы между собой в любой момент, и их не нужно
+    пересчитывать с течением времени.
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='rank',
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        blank=True,
+        null=True,
+        db_index=False,
+    )
+    hot = models.FloatField(default=0)
+    trending = models.FloatField(default=0)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('-hot',), name='rank_hot'),
+            models.Index(fields=('-trending',), name='rank_trending'),
+            models.Index(fields=('group', '-hot'), name='rank_group_hot'),
+            models.Index(
+                fields=('group', '-trending'), name='rank_group_trending'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.post_id}: {self.hot:.2f}/{self.trending:.2f}'
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -125,3 +348,63 @@ class Follow(models.Model):
 
     def __str__(self):
         return f'{self.user} подписался на {self.author}'
+
+
+class ArchivedPost(models.Model):
+    """Пост старше ARCHIVE_AFTER_DAYS, перенесённый из горячей таблицы.
+
+    Ленты архив не читают, а страница поста показывает его только для
+    чтения. Внешних ключей нет, чтобы архив мог лежать в отдельной
+    базе ARCHIVE_DATABASE; автор и группа копируются, комментарии
+    хранятся JSON-списком в виде, который понимает шаблон
+    comment_list.html.
+    """
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField(verbose_name='Текст поста')
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+    archived = models.DateTimeField(
+        verbose_name='Дата переноса в архив',
+        auto_now_add=True,
+    )
+    author_id = models.IntegerField(
+        verbose_name='ID автора',
+        db_index=True,
+    )
+    author_username = models.CharField(
+        verbose_name='Автор поста',
+        max_length=150,
+    )
+    group_slug = models.SlugField(
+        verbose_name='Адрес группы',
+        max_length=200,
+        blank=True,
+    )
+    group_title = models.CharField(
+        verbose_name='Группа',
+        max_length=200,
+        blank=True,
+    )
+    image = models.CharField(
+        verbose_name='Картинка',
+        max_length=100,
+        blank=True,
+    )
+    views = models.PositiveIntegerField(
+        verbose_name='Просмотры',
+        default=0,
+    )
+    comments = models.TextField(
+        verbose_name='Комментарии (JSON)',
+        default='[]',
+    )
+
+    class Meta:
+        verbose_name = 'Пост в архиве'
+        verbose_name_plural = 'Архив постов'
+
+    def __str__(self):
+        return self.text[:15]
+
+    @property
+    def comment_list(self):
+        return json.loads(self.comments)
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import Http404
+
+from core.caching import get_or_compute
+
+from .models import Follow, Post, User
+
+
+class ProfileSummary:
+    """Шапка профиля: автор и его счётчики, общие для всех зрителей."""
+
+    def __init__(self, author, posts_count, followers_count,
+                 following_count):
+        self.author = author
+        self.posts_count = posts_count
+        self.followers_count = followers_count
+        self.following_count = following_count
+
+
+def summary_key(username):
+    return f'profile:summary:{username}'
+
+
+def _count(queryset, field):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')}).order_by().values(
+                field
+            ).annotate(count=Count('pk')).values('count'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def _load_summary(username):
+    author = User.objects.annotate(
+        posts_count=_count(Post.objects.all(), 'author'),
+        followers_count=_count(Follow.objects.all(), 'author'),
+        following_count=_count(Follow.objects.all(), 'user'),
+    ).filter(username=username).first()
+    if author is None:
+        raise Http404
+    return ProfileSummary(
+        author,
+        author.posts_count,
+        author.followers_count,
+        author.following_count,
+    )
+
+
+def get_profile_summary(username):
+    """Сводка профиля за одно обращение к кэшу или один запрос."""
+    return get_or_compute(
+        summary_key(username),
+        lambda: _load_summary(username),
+        settings.PROFILE_CACHE_TIMEOUT,
+    )
+
+
+def invalidate(*usernames):
+    cache.delete_many([summary_key(username) for username in usernames])
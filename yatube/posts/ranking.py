@@ -0,0 +1,96 @@
+import bisect
+import math
+import time
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import transaction
+
+from core.caching import get_or_compute, update
+
+from .models import PostRank
+
+KINDS = ('hot', 'trending')
+
+RANKING_EPOCH = 1609459200
+
+
+def _add_event(score, weight, now, half_life):
+    value = math.log2(weight) + (now - RANKING_EPOCH) / half_life
+    if score is None:
+        return value
+    high, low = max(score, value), min(score, value)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def _cache_key(kind, group_id):
+    return f'ranking:{kind}:{group_id or "all"}'
+
+
+def record(post, weight, now=None):
+    """Учитывает событие поста (публикация, комментарий, просмотры)."""
+    now = now or time.time()
+    with transaction.atomic():
+        rank, created = PostRank.objects.select_for_update().get_or_create(
+            post_id=post.pk, defaults={'group_id': post.group_id}
+        )
+        for kind in KINDS:
+            setattr(rank, kind, _add_event(
+                None if created else getattr(rank, kind),
+                weight,
+                now,
+                settings.RANKING_HALF_LIFE[kind],
+            ))
+        rank.group_id = post.group_id
+        rank.save()
+    for kind in KINDS:
+        score = getattr(rank, kind)
+        _update_top(_cache_key(kind, None), post.pk, score)
+        if post.group_id:
+            _update_top(_cache_key(kind, post.group_id), post.pk, score)
+
+
+def _update_top(key, post_id, score):
+    def change(top):
+        top = [entry for entry in top if entry[1] != post_id]
+        bisect.insort(top, (-score, post_id))
+        return top[:settings.RANKING_TOP_K]
+
+    update(key, change, settings.RANKING_CACHE_TIMEOUT)
+
+
+def top_posts(kind, group=None):
+    """Top-K постов области в виде отсортированного списка
+    пар (-оценка, id поста).
+    """
+    def load():
+        ranks = PostRank.objects.all()
+        if group is not None:
+            ranks = ranks.filter(group=group)
+        return [
+            (-score, post_id)
+            for post_id, score in ranks.order_by(f'-{kind}').values_list(
+                'post_id', kind
+            )[:settings.RANKING_TOP_K]
+        ]
+
+    return get_or_compute(
+        _cache_key(kind, group and group.pk),
+        load,
+        settings.RANKING_CACHE_TIMEOUT,
+    )
+
+
+def ranked_page(queryset, kind, page_number, group=None):
+    """Страница пагинатора с постами queryset в порядке рейтинга."""
+    paginator = Paginator(
+        [post_id for _, post_id in top_posts(kind, group)],
+        settings.POSTS_PER_PAGE
+    )
+    page_obj = paginator.get_page(page_number)
+    posts = queryset.in_bulk(page_obj.object_list)
+    page_obj.object_list = [
+        posts[post_id] for post_id in page_obj.object_list
+        if post_id in posts
+    ]
+    return page_obj
@@ -0,0 +1,26 @@
+from django.conf import settings
+
+ARCHIVE_MODEL = 'posts.archivedpost'
+
+
+class ArchiveRouter:
+    """Держит архив постов в базе ARCHIVE_DATABASE, а остальные
+    модели — в default.
+    """
+
+    def _is_archive(self, model):
+        return model._meta.label_lower == ARCHIVE_MODEL
+
+    def db_for_read(self, model, **hints):
+        if self._is_archive(model):
+            return settings.ARCHIVE_DATABASE
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if f'{app_label}.{model_name}' == ARCHIVE_MODEL:
+            return db == settings.ARCHIVE_DATABASE
+        if db == settings.ARCHIVE_DATABASE and db != 'default':
+            return False
+        return None
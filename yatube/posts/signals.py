@@ -0,0 +1,169 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.signals import request_finished
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.events import publish
+from core.page_cache import bump
+
+from . import aggregates, counts, profiles
+from .counters import get_view_counter
+from .models import Comment, Follow, Group, GroupStats, Post, PostRank
+from .tasks import record_rank
+
+User = get_user_model()
+
+
+def _bulk_deleted(post):
+    """Пост удалён posts.deletion.delete_posts, который сам правит
+    счётчики и кэш для всей пачки.
+    """
+    return getattr(post, 'bulk_deleted', False)
+
+
+@receiver(post_save, sender=Post)
+def rank_post(sender, instance, created, **kwargs):
+    if created:
+        record_rank.delay(instance.pk, 'post', time.time())
+    else:
+        PostRank.objects.filter(post=instance).exclude(
+            group=instance.group_id
+        ).update(group=instance.group_id)
+
+
+@receiver(post_save, sender=Comment)
+def rank_comment(sender, instance, created, **kwargs):
+    if created:
+        record_rank.delay(instance.post_id, 'comment', time.time())
+
+
+@receiver(request_finished)
+def flush_view_counts(sender, **kwargs):
+    counter = get_view_counter(create=False)
+    if counter is not None:
+        counter.flush_if_due()
+
+
+@receiver(post_save, sender=Group)
+def create_group_stats(sender, instance, created, **kwargs):
+    if created:
+        GroupStats.objects.get_or_create(group=instance)
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_group(sender, instance, **kwargs):
+    if instance.pk is None:
+        instance._saved_group_id = None
+        return
+    instance._saved_group_id = Post.objects.filter(
+        pk=instance.pk
+    ).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def count_group_post(sender, instance, created, **kwargs):
+    old_group_id = None if created else instance._saved_group_id
+    if old_group_id == instance.group_id:
+        return
+    if old_group_id is not None:
+        aggregates.remove_post(
+            old_group_id, instance.author_id, instance.pub_date
+        )
+    if instance.group_id is not None:
+        aggregates.add_post(
+            instance.group_id, instance.author_id, instance.pub_date
+        )
+
+
+@receiver(post_delete, sender=Post)
+def uncount_group_post(sender, instance, **kwargs):
+    if instance.group_id is not None and not _bulk_deleted(instance):
+        aggregates.remove_post(
+            instance.group_id, instance.author_id, instance.pub_date
+        )
+
+
+@receiver(post_save, sender=Post)
+def count_post(sender, instance, created, **kwargs):
+    if created:
+        counts.add_post(instance.author_id, 1)
+
+
+@receiver(post_delete, sender=Post)
+def uncount_post(sender, instance, **kwargs):
+    if not _bulk_deleted(instance):
+        counts.add_post(instance.author_id, -1)
+
+
+@receiver(post_delete, sender=User)
+def remove_author_count(sender, instance, **kwargs):
+    counts.remove_author(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    if _bulk_deleted(instance):
+        return
+    profiles.invalidate(instance.author.username)
+    tags = {f'author:{instance.author.username}', f'post:{instance.pk}'}
+    group_ids = {
+        instance.group_id, getattr(instance, '_saved_group_id', None)
+    }
+    tags.update(
+        f'group:{slug}' for slug in Group.objects.filter(
+            pk__in=group_ids - {None}
+        ).values_list('slug', flat=True)
+    )
+    bump(*tags)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    bump(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follow_profiles(sender, instance, **kwargs):
+    profiles.invalidate(instance.user.username, instance.author.username)
+    bump(
+        f'author:{instance.user.username}',
+        f'author:{instance.author.username}',
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_profile(sender, instance, **kwargs):
+    profiles.invalidate(instance.username)
+    bump(f'author:{instance.username}')
+
+
+@receiver(post_save, sender=Group)
+def invalidate_group_pages(sender, instance, **kwargs):
+    bump(f'group:{instance.slug}')
+
+
+@receiver(post_save, sender=Post)
+def publish_new_post(sender, instance, created, **kwargs):
+    if not created:
+        return
+    channels = ['index', f'author:{instance.author_id}']
+    if instance.group_id is not None:
+        channels.append(f'group:{instance.group.slug}')
+    data = {'id': instance.pk}
+    transaction.on_commit(
+        lambda: [publish(channel, 'post', data) for channel in channels]
+    )
+
+
+@receiver(post_save, sender=Comment)
+def publish_new_comment(sender, instance, created, **kwargs):
+    if created:
+        data = {'id': instance.pk}
+        channel = f'post:{instance.post_id}'
+        transaction.on_commit(lambda: publish(channel, 'comment', data))
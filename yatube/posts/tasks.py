@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from sorl.thumbnail import get_thumbnail
+
+from core.tasks import task
+from notifications.models import Notification
+
+from . import ranking
+from .deletion import delete_objects, delete_posts
+from .models import ArchivedPost, Comment, Follow, Post
+
+User = get_user_model()
+
+# Миниатюры, которые выводят шаблоны постов.
+THUMBNAILS = (
+    ('960x339', {'crop': 'center', 'upscale': True}),
+)
+
+
+@task(priority=1)
+def record_rank(post_id, event, now):
+    post = Post.objects.filter(pk=post_id).only('group').first()
+    if post is not None:
+        ranking.record(post, settings.RANKING_WEIGHTS[event], now)
+
+
+@task
+def make_thumbnails(post_id):
+    """Готовит миниатюры картинки поста до первого показа."""
+    post = Post.objects.filter(pk=post_id).only('image').first()
+    if post is None or not post.image:
+        return
+    for geometry, options in THUMBNAILS:
+        get_thumbnail(post.image, geometry, **options)
+
+
+@task(priority=-2)
+def purge_user(user_id):
+    """Удаляет пользователя, его комментарии, уведомления, посты
+    с чужими комментариями, подписки и архив пачками
+    по USER_PURGE_BATCH_SIZE, каждую в своей транзакции, а не одной
+    транзакцией каскадного удаления.
+
+    Задачу можно перезапускать: удалённое уже не выбирается.
+    """
+    size = settings.USER_PURGE_BATCH_SIZE
+    for queryset, delete in (
+        (Comment.objects.filter(author=user_id), delete_objects),
+        (Comment.objects.filter(post__author=user_id), delete_objects),
+        (Notification.objects.filter(author=user_id), delete_objects),
+        (Notification.objects.filter(user=user_id), delete_objects),
+        (
+            Post.objects.filter(author=user_id).select_related(
+                'author', 'group'
+            ),
+            delete_posts,
+        ),
+        (
+            Follow.objects.filter(user=user_id).select_related(
+                'user', 'author'
+            ),
+            delete_objects,
+        ),
+        (
+            Follow.objects.filter(author=user_id).select_related(
+                'user', 'author'
+            ),
+            delete_objects,
+        ),
+        (ArchivedPost.objects.filter(author_id=user_id), delete_objects),
+    ):
+        while True:
+            batch = list(queryset[:size])
+            if not batch:
+                break
+            delete(batch)
+    user = User.objects.filter(pk=user_id).first()
+    if user is not None:
+        user.delete()
+
+
+def delete_user_later(user):
+    """Сразу закрывает пользователю вход, а его данные удаляет
+    в фоне задачей purge_user.
+    """
+    user.is_active = False
+    user.save(update_fields=['is_active'])
+    purge_user.delay(user.pk)
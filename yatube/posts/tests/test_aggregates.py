@@ -0,0 +1,94 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, GroupStats, Post
+
+User = get_user_model()
+
+
+class GroupStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.first_author = User.objects.create_user(username='Andrey')
+        cls.second_author = User.objects.create_user(username='Ivan')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_stats_follow_post_changes(self):
+        """Агрегаты группы обновляются при создании, переносе
+        и удалении постов.
+        """
+        Post.objects.create(
+            author=self.first_author, text='Текст', group=self.group
+        )
+        Post.objects.create(
+            author=self.second_author, text='Текст', group=self.group
+        )
+        latest = Post.objects.create(
+            author=self.second_author, text='Текст', group=self.group
+        )
+        stats = GroupStats.objects.get(group=self.group)
+        self.assertEqual(stats.posts_count, 3)
+        self.assertEqual(stats.last_post_at, latest.pub_date)
+        self.assertEqual(stats.top_authors_list, ['Ivan', 'Andrey'])
+
+        latest.group = self.other_group
+        latest.save()
+        stats.refresh_from_db()
+        self.assertEqual(stats.posts_count, 2)
+        self.assertLess(stats.last_post_at, latest.pub_date)
+        self.assertEqual(
+            GroupStats.objects.get(group=self.other_group).posts_count, 1
+        )
+
+        Post.objects.filter(group=self.group).delete()
+        stats.refresh_from_db()
+        self.assertEqual(stats.posts_count, 0)
+        self.assertIsNone(stats.last_post_at)
+        self.assertEqual(stats.top_authors_list, [])
+
+    def test_directory_sorted_by_activity(self):
+        """Каталог групп по умолчанию отсортирован по активности."""
+        Post.objects.create(
+            author=self.first_author, text='Текст', group=self.other_group
+        )
+        response = self.guest_client.get(reverse('posts:group_directory'))
+        self.assertTemplateUsed(response, 'posts/group_directory.html')
+        self.assertEqual(
+            [stats.group for stats in response.context['page_obj']],
+            [self.other_group, self.group]
+        )
+
+    def test_directory_query_budget_is_fixed(self):
+        """Число запросов каталога не зависит от размера групп."""
+        with self.assertNumQueries(2):
+            self.guest_client.get(reverse('posts:group_directory_api'))
+        for number in range(5):
+            Post.objects.create(
+                author=User.objects.create_user(username=f'Author{number}'),
+                text='Текст',
+                group=self.group,
+            )
+        with self.assertNumQueries(2):
+            response = self.guest_client.get(
+                reverse('posts:group_directory_api') + '?sort=posts'
+            )
+        results = response.json()['results']
+        self.assertEqual(results[0]['slug'], 'test-slug')
+        self.assertEqual(results[0]['posts_count'], 5)
+        self.assertEqual(len(results[0]['top_authors']), 3)
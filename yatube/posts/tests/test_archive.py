@@ -0,0 +1,184 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import pre_delete
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from notifications.models import Notification
+
+from .. import counts
+from ..models import ArchivedPost, Comment, Follow, Group, GroupStats, Post
+from ..tasks import delete_user_later, purge_user
+
+User = get_user_model()
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Andrey')
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.old = Post.objects.create(
+            author=self.author, text='Старый пост', group=self.group
+        )
+        self.fresh = Post.objects.create(
+            author=self.author, text='Новый пост', group=self.group
+        )
+        Comment.objects.create(
+            post=self.old, author=self.reader, text='Старый комментарий'
+        )
+        Post.objects.filter(pk=self.old.pk).update(
+            pub_date=timezone.now() - timedelta(days=400)
+        )
+
+    def test_old_posts_are_archived(self):
+        """Команда переносит старые посты с комментариями в архив."""
+        out = StringIO()
+        call_command('archive_posts', '--batch', '1', stdout=out)
+        self.assertIn('Перенесено в архив постов: 1', out.getvalue())
+        self.assertFalse(Post.objects.filter(pk=self.old.pk).exists())
+        self.assertTrue(Post.objects.filter(pk=self.fresh.pk).exists())
+        archived = ArchivedPost.objects.get(pk=self.old.pk)
+        self.assertEqual(archived.author_username, self.author.username)
+        self.assertEqual(archived.group_slug, self.group.slug)
+        self.assertEqual(
+            [comment['text'] for comment in archived.comment_list],
+            ['Старый комментарий'],
+        )
+        response = Client().get(reverse('posts:index'))
+        texts = [post.text for post in response.context['page_obj']]
+        self.assertEqual(texts, ['Новый пост'])
+
+    def test_archived_post_page(self):
+        """Страница архивного поста открывается только для чтения."""
+        call_command('archive_posts', verbosity=0)
+        response = Client().get(
+            reverse('posts:post_detail', args=[self.old.pk])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'posts/post_archived.html')
+        self.assertContains(response, 'Старый пост')
+        self.assertContains(response, 'Старый комментарий')
+        missing = Client().get(reverse('posts:post_detail', args=[0]))
+        self.assertEqual(missing.status_code, 404)
+
+
+class PurgeUserTests(TestCase):
+    @override_settings(USER_PURGE_BATCH_SIZE=2)
+    def test_user_is_purged_in_batches(self):
+        """Удаление пользователя закрывает вход и удаляет его данные."""
+        user = User.objects.create_user(username='Leaving')
+        other = User.objects.create_user(username='Staying')
+        group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        kept = Post.objects.create(author=other, text='Чужой пост')
+        Post.objects.create(author=other, text='Пост в группе', group=group)
+        for index in range(5):
+            Post.objects.create(author=user, text=f'Пост {index}', group=group)
+        Comment.objects.create(post=kept, author=user, text='Комментарий')
+        Follow.objects.create(user=user, author=other)
+        Follow.objects.create(user=other, author=user)
+        delete_user_later(user)
+        self.assertFalse(User.objects.filter(pk=user.pk).exists())
+        self.assertFalse(Post.objects.filter(author=user.pk).exists())
+        self.assertFalse(Comment.objects.filter(author=user.pk).exists())
+        self.assertFalse(Follow.objects.exists())
+        self.assertTrue(Post.objects.filter(pk=kept.pk).exists())
+        self.assertEqual(GroupStats.objects.get(group=group).posts_count, 1)
+        self.assertEqual(counts.site_count(), 2)
+
+    def test_purge_queries_do_not_grow_with_posts(self):
+        """Посты, чужие комментарии к ним и уведомления удаляются
+        пачками, а не каскадом и сигналами на каждый объект.
+        """
+        group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        queries = []
+        for number in (2, 6):
+            user = User.objects.create_user(username=f'Leaving{number}')
+            for index in range(number):
+                other = User.objects.create_user(
+                    username=f'Other{number}-{index}'
+                )
+                Follow.objects.create(user=other, author=user)
+                Follow.objects.create(user=user, author=other)
+                Notification.objects.create(user=user, author=other)
+            for index in range(number):
+                post = Post.objects.create(
+                    author=user, text='Пост', group=group
+                )
+                Comment.objects.create(
+                    post=post, author=other, text='Комментарий'
+                )
+            self.assertEqual(
+                Notification.objects.filter(author=user).count(), number
+            )
+            with CaptureQueriesContext(connection) as context:
+                purge_user(user.pk)
+            queries.append(len(context))
+            self.assertFalse(Comment.objects.filter(author=other).exists())
+            self.assertFalse(Notification.objects.exists())
+        self.assertEqual(queries[0], queries[1])
+
+    @override_settings(USER_PURGE_BATCH_SIZE=2)
+    def test_user_row_has_nothing_to_cascade(self):
+        """К удалению строки пользователя его данные и чужие данные
+        о нём уже удалены пачками.
+        """
+        user = User.objects.create_user(username='Leaving')
+        other = User.objects.create_user(username='Staying')
+        Follow.objects.create(user=other, author=user)
+        Notification.objects.create(user=user, author=other)
+        for index in range(3):
+            post = Post.objects.create(author=user, text=f'Пост {index}')
+            Comment.objects.create(post=post, author=other, text='Ответ')
+        left = []
+
+        def remember_left(sender, instance, **kwargs):
+            left.extend([
+                Comment.objects.filter(post__author=instance).count(),
+                Notification.objects.filter(author=instance).count(),
+                Notification.objects.filter(user=instance).count(),
+            ])
+
+        pre_delete.connect(remember_left, sender=User)
+        try:
+            purge_user(user.pk)
+        finally:
+            pre_delete.disconnect(remember_left, sender=User)
+        self.assertEqual(left, [0, 0, 0])
+
+    def test_admin_confirmation_skips_cascade(self):
+        """Подтверждение удаления в админке не обходит данные
+        пользователя.
+        """
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        user = User.objects.create_user(username='Leaving')
+        Post.objects.create(author=user, text='Пост')
+        client = Client()
+        client.force_login(admin)
+        response = client.get(
+            reverse('admin:auth_user_delete', args=[user.pk])
+        )
+        self.assertContains(response, 'Leaving')
+        self.assertNotContains(response, 'Пост')
@@ -0,0 +1,85 @@
+from concurrent.futures import Future
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+
+from .. import batching
+from ..batching import CommentNotSaved, CommentWriteQueue, save_comment
+from ..models import Comment, Post
+
+User = get_user_model()
+
+
+class CommentWriteQueueTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Andrey')
+        cls.post = Post.objects.create(author=cls.user, text='Текст')
+
+    def test_flush_saves_batch_and_acknowledges(self):
+        """Пачка комментариев сохраняется, каждый запрос получает ответ."""
+        queue = CommentWriteQueue(interval=1, max_batch=10)
+        futures = [
+            queue.submit(
+                Comment(post=self.post, author=self.user, text=f'К{number}')
+            )
+            for number in range(3)
+        ]
+        self.assertFalse(any(future.done() for future in futures))
+        self.assertEqual(queue.flush(), 3)
+        self.assertEqual(Comment.objects.count(), 3)
+        for future in futures:
+            self.assertIsNotNone(future.result(timeout=0).pk)
+
+    def test_failed_comment_does_not_break_batch(self):
+        """Ошибка в одном комментарии не откатывает остальные."""
+        queue = CommentWriteQueue(interval=1, max_batch=10)
+        broken = queue.submit(
+            Comment(post=self.post, author=self.user, text=None)
+        )
+        valid = queue.submit(
+            Comment(post=self.post, author=self.user, text='К')
+        )
+        queue.flush()
+        self.assertIsNotNone(valid.result(timeout=0).pk)
+        self.assertIsNotNone(broken.exception(timeout=0))
+        self.assertEqual(Comment.objects.count(), 1)
+
+    @override_settings(COMMENT_WRITE_BATCHING=True, COMMENT_BATCH_TIMEOUT=0)
+    def test_timed_out_comment_is_not_written(self):
+        """Неподтверждённый вовремя комментарий снимается с очереди."""
+        queue = CommentWriteQueue(interval=1, max_batch=10)
+        comment = Comment(post=self.post, author=self.user, text='К')
+        with mock.patch(
+            'posts.batching.get_comment_queue', return_value=queue
+        ):
+            with self.assertRaises(CommentNotSaved):
+                save_comment(comment)
+        self.assertEqual(queue.flush(), 0)
+        self.assertFalse(Comment.objects.exists())
+
+    @override_settings(COMMENT_WRITE_BATCHING=True)
+    def test_write_error_is_reported_as_not_saved(self):
+        """Ошибка записи пачки превращается в CommentNotSaved."""
+        failed = Future()
+        failed.set_exception(IntegrityError('post was deleted'))
+        queue = mock.Mock(submit=mock.Mock(return_value=failed))
+        with mock.patch(
+            'posts.batching.get_comment_queue', return_value=queue
+        ):
+            with self.assertRaises(CommentNotSaved):
+                save_comment(
+                    Comment(post=self.post, author=self.user, text='К')
+                )
+
+    def test_stopped_writer_thread_is_restarted(self):
+        """Остановившийся поток записи запускается заново."""
+        queue = CommentWriteQueue(interval=1, max_batch=10)
+        with mock.patch.object(batching, '_queue', queue):
+            self.assertFalse(queue.is_alive())
+            with mock.patch.object(CommentWriteQueue, 'start') as start:
+                self.assertIs(batching.get_comment_queue(), queue)
+            start.assert_called_once_with()
@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..cards import PostCard
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+@override_settings(POST_EXCERPT_LENGTH=10)
+class PostCardTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Andrey')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.long_post = Post.objects.create(
+            author=cls.author, text='Очень длинный текст поста',
+            group=cls.group,
+        )
+        cls.short_post = Post.objects.create(
+            author=cls.author, text='Короткий'
+        )
+
+    def test_cards_have_card_fields_only(self):
+        """Карточки содержат поля шаблона и обрезанный текст."""
+        with self.assertNumQueries(1):
+            cards = {card.id: card for card in Post.objects.cards()}
+        long_card = cards[self.long_post.id]
+        self.assertIsInstance(long_card, PostCard)
+        self.assertFalse(hasattr(long_card, '__dict__'))
+        self.assertEqual(long_card, self.long_post)
+        self.assertEqual(long_card.text, 'Очень')
+        self.assertTrue(long_card.truncated)
+        self.assertEqual(long_card.author.username, 'Andrey')
+        self.assertEqual(long_card.group.slug, 'test-slug')
+        short_card = cards[self.short_post.id]
+        self.assertFalse(short_card.truncated)
+        self.assertIsNone(short_card.group)
+
+    def test_feed_api_returns_cards(self):
+        """API ленты отдаёт страницу карточек."""
+        response = Client().get(reverse('posts:index_api'))
+        data = response.json()
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(
+            [card['id'] for card in data['results']],
+            [self.short_post.id, self.long_post.id],
+        )
+        self.assertEqual(data['results'][1]['group'], 'test-slug')
+
+    @override_settings(POST_EXCERPT_LENGTH=100, POST_EXCERPT_PARAGRAPHS=2)
+    def test_excerpt_made_on_save(self):
+        """Выдержка без тегов и лишних абзацев сохраняется вместе
+        с постом и обновляется при правке текста.
+        """
+        post = Post.objects.create(
+            author=self.author,
+            text='<b>Первый</b>   абзац\n\nВторой абзац\n\nТретий абзац',
+        )
+        self.assertEqual(post.excerpt, 'Первый абзац\n\nВторой абзац')
+        self.assertTrue(post.excerpt_truncated)
+        post.text = 'Новый текст'
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, 'Новый текст')
+        self.assertFalse(post.excerpt_truncated)
@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..counters import ViewCounter
+from ..hyperloglog import HyperLogLog
+from ..models import Post, PostRank
+
+User = get_user_model()
+
+
+class ViewCounterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Andrey')
+        cls.post = Post.objects.create(author=cls.user, text='Текст')
+
+    def setUp(self):
+        cache.clear()
+        self.journal_dir = tempfile.mkdtemp()
+        self.counter = ViewCounter(self.journal_dir, flush_interval=60)
+
+    def tearDown(self):
+        shutil.rmtree(self.journal_dir, ignore_errors=True)
+
+    def test_hits_are_written_in_one_batch(self):
+        """Просмотры копятся в памяти и пишутся одной пачкой."""
+        rank = PostRank.objects.get(post=self.post).hot
+        with self.assertNumQueries(0):
+            for _ in range(3):
+                self.counter.hit(self.post.pk)
+        self.assertEqual(self.counter.pending(self.post.pk), 3)
+        self.counter.flush()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 3)
+        self.assertEqual(self.counter.pending(self.post.pk), 0)
+        self.assertGreater(PostRank.objects.get(post=self.post).hot, rank)
+        self.assertEqual(os.listdir(self.journal_dir), [])
+
+    def test_ranking_error_does_not_count_views_twice(self):
+        """Сбой после записи просмотров не возвращает их в очередь."""
+        self.counter.hit(self.post.pk)
+        with mock.patch(
+            'posts.ranking.record', side_effect=RuntimeError
+        ):
+            self.counter.flush()
+        self.assertEqual(self.counter.pending(self.post.pk), 0)
+        self.counter.flush()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 1)
+
+    def test_flush_waits_for_interval(self):
+        """Запись после запроса происходит не чаще раза в интервал."""
+        self.counter.hit(self.post.pk)
+        self.counter.flush_if_due()
+        self.assertEqual(self.counter.pending(self.post.pk), 1)
+        self.counter.flush_interval = 0
+        self.counter.flush_if_due()
+        self.assertEqual(self.counter.pending(self.post.pk), 0)
+
+    def test_recover_applies_journal_of_dead_process(self):
+        """Журнал упавшего процесса применяется, а журнал живого —
+        нет, даже если его просмотры ещё не записаны в базу.
+        """
+        alive = ViewCounter(self.journal_dir, flush_interval=60)
+        for _ in range(3):
+            alive.hit(self.post.pk)
+        self.counter.recover()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 0)
+        # Падение процесса: блокировка журнала снимается вместе с ним.
+        os.close(alive._journal[1])
+        path = os.path.join(self.journal_dir, 'views-orphan.log')
+        with open(path, 'w') as journal:
+            journal.write(f'{self.post.pk}\n{self.post.pk}\n{self.post.pk}')
+        self.counter.recover()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 5)
+        self.assertEqual(os.listdir(self.journal_dir), [])
+
+    def test_unique_viewers_estimate(self):
+        """HyperLogLog оценивает число уникальных зрителей."""
+        counter = ViewCounter(self.journal_dir, 60, track_unique=True)
+        for viewer in range(1000):
+            counter.hit(self.post.pk, viewer)
+            counter.hit(self.post.pk, viewer)
+        counter.flush()
+        self.assertAlmostEqual(
+            counter.unique_viewers(self.post.pk), 1000, delta=100
+        )
+        estimate = HyperLogLog()
+        estimate.add('viewer')
+        self.assertEqual(estimate.count(), 1)
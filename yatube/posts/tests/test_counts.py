@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from core.paginator import EstimatedCountPaginator
+
+from .. import counts
+from ..models import Follow, Group, Post, ScopeCount
+
+User = get_user_model()
+
+
+class ScopeCountTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Andrey')
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def test_counts_follow_posts(self):
+        """Счётчики областей меняются вместе с постами."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        posts = [
+            Post.objects.create(
+                author=self.author, text='Текст', group=self.group
+            )
+            for _ in range(3)
+        ]
+        Post.objects.create(author=self.reader, text='Текст')
+        posts[0].delete()
+        self.assertEqual(counts.site_count(), 3)
+        self.assertEqual(counts.author_count(self.author.pk), 2)
+        self.assertEqual(counts.group_count(self.group.pk), 2)
+        self.assertEqual(counts.feed_count(self.reader), 2)
+        self.reader.delete()
+        self.assertEqual(counts.site_count(), 2)
+        self.assertFalse(ScopeCount.objects.filter(
+            kind=ScopeCount.AUTHOR, object_id=self.reader.pk
+        ).exists())
+
+    def test_paginator_uses_estimate_for_large_lists(self):
+        """Большие списки не считаются через COUNT(*), небольшие
+        считаются точно.
+        """
+        Post.objects.create(author=self.author, text='Текст')
+        posts = Post.objects.all()
+        with override_settings(PAGINATOR_EXACT_COUNT_THRESHOLD=100):
+            paginator = EstimatedCountPaginator(posts, 10, lambda: 500)
+            self.assertEqual(paginator.count, 500)
+            self.assertEqual(paginator.num_pages, 50)
+            paginator = EstimatedCountPaginator(posts, 10, lambda: 50)
+            self.assertEqual(paginator.count, 1)
+            paginator = EstimatedCountPaginator(posts, 10, lambda: None)
+            self.assertEqual(paginator.count, 1)
@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.events import get_broker
+
+from ..models import Post
+
+User = get_user_model()
+
+
+class LiveEventsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Andrey')
+        cls.post = Post.objects.create(author=cls.author, text='Текст')
+
+    def test_comment_events_are_streamed(self):
+        """Поток поста отдаёт номера новых комментариев."""
+        response = Client().get(
+            reverse('posts:live_events'), {'post': self.post.pk}
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        get_broker().publish(f'post:{self.post.pk}', 'comment', {'id': 5})
+        chunks = iter(response.streaming_content)
+        self.assertTrue(next(chunks).startswith(b'retry: '))
+        chunk = next(chunks).decode()
+        self.assertIn('event: comment\n', chunk)
+        self.assertIn('data: {"id": 5}\n', chunk)
+        response.close()
+
+    def test_feed_requires_login(self):
+        response = Client().get(reverse('posts:live_events'), {'feed': 1})
+        self.assertEqual(response.status_code, 403)
+        response = Client().get(
+            reverse('posts:live_events'), {'notifications': 1}
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_pages_subscribe_only_with_live_url(self):
+        """Без LIVE_EVENTS_URL страницы не открывают поток."""
+        url = reverse('posts:index')
+        cache.clear()
+        self.assertNotContains(Client().get(url), 'data-live')
+        cache.clear()
+        with override_settings(LIVE_EVENTS_URL='/live/'):
+            response = Client().get(url)
+        self.assertContains(response, 'data-live="/live/?index=1"')
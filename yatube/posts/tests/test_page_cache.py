@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..counters import get_view_counter
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class SharedPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Andrey')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, text='Тестовый текст', group=cls.group
+        )
+        cls.url = reverse('posts:post_detail', kwargs={'post': cls.post.id})
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader = User.objects.create_user(username='Reader')
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_shared_page_has_personal_parts(self):
+        """Одна копия страницы отдаётся всем, а кнопки и форма
+        подставляются для каждого зрителя.
+        """
+        response = self.author_client.get(self.url)
+        self.assertTemplateUsed(response, 'posts/post_detail.html')
+        self.assertContains(response, 'Редактировать запись')
+        self.assertContains(response, 'Пользователь: Andrey')
+        response = self.reader_client.get(self.url)
+        self.assertTemplateNotUsed(response, 'posts/post_detail.html')
+        self.assertNotContains(response, 'Редактировать запись')
+        self.assertContains(response, 'Добавить комментарий')
+        self.assertContains(response, 'Пользователь: Reader')
+        self.assertContains(response, 'csrfmiddlewaretoken')
+        response = self.guest_client.get(self.url)
+        self.assertNotContains(response, 'Добавить комментарий')
+        self.assertNotContains(response, '<!--personal:')
+
+    def test_anonymous_hit_without_queries(self):
+        """Повторная страница для анонима не обращается к базе."""
+        self.guest_client.get(self.url)
+        with self.assertNumQueries(0):
+            self.guest_client.get(self.url)
+
+    def test_views_do_not_invalidate_page(self):
+        """Запись просмотров не сбрасывает копию страницы, а счётчик
+        на ней всё равно свежий.
+        """
+        counter = get_view_counter()
+        self.guest_client.get(self.url)
+        counter.flush()
+        self.post.refresh_from_db()
+        views = self.post.views + counter.pending(self.post.pk)
+        response = self.guest_client.get(self.url)
+        self.assertTemplateNotUsed(response, 'posts/post_detail.html')
+        self.assertContains(response, f'<span> {views} </span>')
+
+    def test_changes_invalidate_tagged_pages(self):
+        """Изменения поста, комментариев и группы сбрасывают
+        кэшированные страницы с их тегами.
+        """
+        group_url = reverse('posts:group_list', kwargs={'slug': 'test-slug'})
+        self.guest_client.get(self.url)
+        self.guest_client.get(group_url)
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Новый комментарий'
+        )
+        response = self.guest_client.get(self.url)
+        self.assertContains(response, 'Новый комментарий')
+        self.group.title = 'Новое название'
+        self.group.save()
+        self.assertContains(self.guest_client.get(group_url), 'Новое название')
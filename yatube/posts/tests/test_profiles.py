@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Follow, Post
+
+User = get_user_model()
+
+
+class ProfileSummaryTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Andrey')
+        cls.post = Post.objects.create(author=cls.author, text='Текст')
+        cls.url = reverse('posts:profile', kwargs={'username': 'Andrey'})
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.user = User.objects.create_user(username='User')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_summary_counts(self):
+        """Сводка профиля содержит счётчики и подписку зрителя."""
+        Follow.objects.create(user=self.user, author=self.author)
+        response = self.authorized_client.get(self.url)
+        summary = response.context['summary']
+        self.assertEqual(summary.posts_count, 1)
+        self.assertEqual(summary.followers_count, 1)
+        self.assertEqual(summary.following_count, 0)
+        self.assertContains(response, 'Отписаться')
+
+    def test_follow_state_is_per_viewer(self):
+        """Подписка одного зрителя не видна другому."""
+        self.authorized_client.get(self.url)
+        Follow.objects.create(user=self.user, author=self.author)
+        other = Client()
+        other.force_login(User.objects.create_user(username='Other'))
+        self.assertContains(other.get(self.url), 'Подписаться')
+        self.assertContains(self.authorized_client.get(self.url), 'Отписаться')
+
+    def test_anonymous_page_is_cached_until_change(self):
+        """Страница профиля для анонима отдаётся из кэша
+        до изменения постов автора.
+        """
+        first = self.guest_client.get(self.url)
+        with self.assertNumQueries(0):
+            cached = self.guest_client.get(self.url)
+        self.assertEqual(first.content, cached.content)
+        Post.objects.create(author=self.author, text='Новый пост')
+        response = self.guest_client.get(self.url)
+        self.assertEqual(response.context['summary'].posts_count, 2)
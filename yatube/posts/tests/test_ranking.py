@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import ranking
+from ..models import Comment, Group, Post, PostRank
+
+User = get_user_model()
+
+
+class RankingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Andrey')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.quiet_post = Post.objects.create(
+            author=cls.user, text='Тихий пост', group=cls.group
+        )
+        cls.popular_post = Post.objects.create(
+            author=cls.user, text='Популярный пост', group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_recent_events_outweigh_old_ones(self):
+        """Старое событие весит меньше свежего."""
+        old = ranking._add_event(None, 1, 0, 3600)
+        fresh = ranking._add_event(None, 1, 3600, 3600)
+        self.assertEqual(fresh - old, 1)
+        self.assertEqual(ranking._add_event(old, 1, 0, 3600), old + 1)
+
+    def test_comments_raise_post_in_hot_tabs(self):
+        """Пост с комментариями поднимается во вкладках рейтинга."""
+        Comment.objects.create(
+            post=self.quiet_post, author=self.user, text='Комментарий'
+        )
+        pages = (
+            reverse('posts:index') + '?tab=hot',
+            reverse('posts:index') + '?tab=trending',
+            reverse('posts:group_list', kwargs={'slug': 'test-slug'})
+            + '?tab=hot',
+        )
+        for url in pages:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(
+                    list(response.context['page_obj']),
+                    [self.quiet_post, self.popular_post]
+                )
+
+    def test_cached_top_is_updated_incrementally(self):
+        """Кэшированный top-K обновляется на месте при новом событии."""
+        ranking.top_posts('hot')
+        ranking.record(self.quiet_post, 10)
+        top = ranking.top_posts('hot')
+        self.assertEqual(top[0][1], self.quiet_post.pk)
+        self.assertEqual(
+            -top[0][0], PostRank.objects.get(post=self.quiet_post).hot
+        )
@@ -2,13 +2,16 @@ import tempfile
 import shutil
 
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase, override_settings
+from django.test import Client, RequestFactory, TestCase, override_settings
 from django.urls import reverse
 from django import forms
+from ..fragments import follow_button
 from ..models import Comment, Follow, Post, Group
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.conf import settings
 from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 User = get_user_model()
 
@@ -94,8 +97,9 @@ class PostPagesTests(TestCase):
         for reverse_name in page_names:
             response = self.authorized_client.get(reverse_name)
             self.assertEqual(response.context['page_obj'].count(self.post), 1)
-        self.assertEqual(response.context['post'].text, 'Текст')
-        self.assertEqual(response.context['post'].image, 'posts/small.gif')
+        post = response.context['page_obj'][0]
+        self.assertEqual(post.text, 'Текст')
+        self.assertEqual(post.image, 'posts/small.gif')
 
     def test_post_detail_pages_show_correct_context(self):
         """Шаблон post_detail сформирован с правильным контекстом."""
@@ -191,6 +195,74 @@ class PostPagesTests(TestCase):
             'posts:profile', kwargs={'username': 'Andrey'}),
         )
 
+    def test_feed_marks_followed_authors(self):
+        """Лента отмечает авторов, на которых подписан пользователь."""
+        Follow.objects.create(user=self.user, author=self.user_following)
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Отписаться')
+        response = self.authorized_client.get(
+            reverse('posts:profile', kwargs={'username': 'Andrey'})
+        )
+        self.assertContains(response, 'Отписаться')
+
+    def test_follow_state_resolved_in_one_query(self):
+        """Подписки на авторов страницы выбираются одним запросом."""
+        Follow.objects.create(user=self.user, author=self.user_following)
+        authors = [self.user_following] + [
+            User.objects.create_user(username=f'Author{number}')
+            for number in range(3)
+        ]
+        request = RequestFactory().get('/')
+        request.user = self.user
+        with self.assertNumQueries(1):
+            buttons = follow_button(request, [
+                {'author_id': str(author.pk), 'username': author.username}
+                for author in authors
+            ])
+        self.assertEqual(len(buttons), 4)
+        self.assertIn('Отписаться', buttons[0])
+        self.assertFalse(any('Отписаться' in html for html in buttons[1:]))
+
+    def test_post_follow_state_in_page_query(self):
+        """Состояние подписки приходит в том же запросе, что и посты."""
+        Follow.objects.create(user=self.user, author=self.user_following)
+        Post.objects.create(
+            author=User.objects.create_user(username='Author'), text='Текст'
+        )
+        with self.assertNumQueries(1):
+            states = {
+                post.author.username: post.author.is_followed_by_viewer
+                for post in Post.objects.with_follow_state(self.user)
+            }
+        self.assertEqual(states, {'Andrey': True, 'Author': False})
+
+    def test_pages_query_count_does_not_grow_with_page_size(self):
+        """Число запросов страниц не зависит от числа постов
+        и комментариев на них.
+        """
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'test-slug'}),
+            reverse('posts:post_detail', kwargs={'post': '1'}),
+        )
+        Comment.objects.create(post=self.post, author=self.user, text='К')
+        counts = {}
+        for url in urls:
+            self.guest_client.get(url)
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                self.guest_client.get(url)
+            counts[url] = len(queries)
+        for number in range(3):
+            author = User.objects.create_user(username=f'Author{number}')
+            Post.objects.create(author=author, text='Текст', group=self.group)
+            Comment.objects.create(post=self.post, author=author, text='К')
+        for url in urls:
+            with self.subTest(url=url):
+                cache.clear()
+                with self.assertNumQueries(counts[url]):
+                    self.guest_client.get(url)
+
     def test_user_comment_post(self):
         """Проверка того, что авторизованный пользователь
         может писать комментарии к посту.
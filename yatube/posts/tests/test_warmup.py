@@ -0,0 +1,78 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.warmup import urls_from_access_log, warm
+
+from ..counters import get_view_counter
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class WarmCacheCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Andrey')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, text='Тестовый текст', group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_popular_pages_are_cached(self):
+        """Прогрев заполняет кэш страниц и не считается просмотром."""
+        counter = get_view_counter()
+        views = counter.pending(self.post.pk)
+        out = StringIO()
+        call_command('warm_cache', '--concurrency', '1', stdout=out)
+        output = out.getvalue()
+        self.assertIn('ошибок: 0', output)
+        self.assertEqual(counter.pending(self.post.pk), views)
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.author.username]),
+            reverse('posts:post_detail', args=[self.post.pk]),
+        ):
+            self.assertIn(url, output)
+            with self.assertNumQueries(0):
+                self.assertEqual(Client().get(url).status_code, 200)
+
+    def test_errors_become_responses(self):
+        """Прогрев идёт через обработчик приложения: ошибки страниц
+        приходят ответами, как у посетителя.
+        """
+        results = warm(['/', '/missing/'])
+        self.assertEqual(
+            [result.status for result in results], [200, 404]
+        )
+
+    def test_urls_from_access_log(self):
+        """Адреса берутся из лога по частоте, статика пропускается."""
+        log = StringIO(
+            '1.1.1.1 - - [19/Oct/2026:10:00:00 +0000] '
+            '"GET /group/test-slug/ HTTP/1.1" 200 512\n'
+            '1.1.1.2 - - [19/Oct/2026:10:00:01 +0000] '
+            '"GET /group/test-slug/ HTTP/1.1" 200 512\n'
+            '1.1.1.2 - - [19/Oct/2026:10:00:02 +0000] '
+            '"GET /static/css/bootstrap.min.css HTTP/1.1" 200 9000\n'
+            '1.1.1.3 - - [19/Oct/2026:10:00:03 +0000] '
+            '"GET /missing/ HTTP/1.1" 404 100\n'
+            '1.1.1.3 - - [19/Oct/2026:10:00:04 +0000] '
+            '"GET / HTTP/1.1" 200 2048\n'
+        )
+        self.assertEqual(
+            urls_from_access_log(log, 5), ['/group/test-slug/', '/']
+        )
@@ -9,6 +9,14 @@ app_name = 'core'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('api/posts/', views.index_api, name='index_api'),
+    path('live/', views.live_events, name='live_events'),
+    path('groups/', views.group_directory, name='group_directory'),
+    path(
+        'groups/api/',
+        views.group_directory_api,
+        name='group_directory_api'
+    ),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post>/', views.post_detail, name='post_detail'),
@@ -1,75 +1,196 @@
 from django.conf import settings
+from django.core.files.storage import default_storage
 from django.core.paginator import Paginator
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render, get_object_or_404
-from .models import Post, Group, User, Follow
+from .models import ArchivedPost, Post, Group, GroupStats, User, Follow
 from posts.forms import PostForm, CommentForm
+from posts.batching import CommentNotSaved, save_comment
+from posts import counts, profiles, ranking
+from posts.counters import get_view_counter
+from posts.tasks import make_thumbnails
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect
-from django.views.decorators.cache import cache_page
+from django.db.models import F
+from core.page_cache import personalized, shared_page
+from core.events import sse_response
+from core.paginator import EstimatedCountPaginator
+from core.throttling import client_ip, throttle
+from core.warmup import is_warmup
+from notifications.services import live_channel, mark_read
 
 
-@cache_page(20, key_prefix='index_page')
+@shared_page(20, 'index')
 def index(request):
-    posts = Post.objects.all()
-    paginator = Paginator(posts, settings.POSTS_PER_PAGE)
+    posts = Post.objects.cards()
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    tab = request.GET.get('tab')
+    if tab in ranking.KINDS:
+        page_obj = ranking.ranked_page(posts, tab, page_number)
+    else:
+        paginator = EstimatedCountPaginator(
+            posts, settings.POSTS_PER_PAGE, estimate=counts.site_count
+        )
+        page_obj = paginator.get_page(page_number)
     title = 'Последние обновления на сайте'
     context = {
         'title': title,
         'page_obj': page_obj,
+        'tab': tab,
     }
     return render(request, 'posts/index.html', context)
 
 
+def index_api(request):
+    paginator = EstimatedCountPaginator(
+        Post.objects.cards(), settings.POSTS_PER_PAGE,
+        estimate=counts.site_count,
+    )
+    page_obj = paginator.get_page(request.GET.get('page'))
+    return JsonResponse({
+        'page': page_obj.number,
+        'num_pages': paginator.num_pages,
+        'count': paginator.count,
+        'results': [card.as_dict() for card in page_obj],
+    })
+
+
+@shared_page(
+    settings.PAGE_CACHE_TIMEOUT, 'group',
+    tags=lambda request, slug: [f'group:{slug}'],
+)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    paginator = Paginator(posts, settings.POSTS_PER_PAGE)
+    posts = group.posts.cards()
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    tab = request.GET.get('tab')
+    if tab in ranking.KINDS:
+        page_obj = ranking.ranked_page(posts, tab, page_number, group)
+    else:
+        paginator = EstimatedCountPaginator(
+            posts, settings.POSTS_PER_PAGE,
+            estimate=lambda: counts.group_count(group.pk),
+        )
+        page_obj = paginator.get_page(page_number)
     context = {
         'group': group,
         'posts': posts,
         'page_obj': page_obj,
+        'tab': tab,
     }
     return render(request, 'posts/group_list.html', context)
 
 
+GROUP_ORDERINGS = {
+    'activity': F('last_post_at').desc(nulls_last=True),
+    'posts': F('posts_count').desc(),
+    'title': F('group__title').asc(),
+}
+
+
+def get_group_directory_page(request):
+    sort = request.GET.get('sort')
+    if sort not in GROUP_ORDERINGS:
+        sort = 'activity'
+    stats = GroupStats.objects.select_related('group').order_by(
+        GROUP_ORDERINGS[sort]
+    )
+    paginator = Paginator(stats, settings.GROUPS_PER_PAGE)
+    return sort, paginator.get_page(request.GET.get('page'))
+
+
+def group_directory(request):
+    sort, page_obj = get_group_directory_page(request)
+    context = {
+        'sort': sort,
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/group_directory.html', context)
+
+
+def group_directory_api(request):
+    sort, page_obj = get_group_directory_page(request)
+    return JsonResponse({
+        'sort': sort,
+        'page': page_obj.number,
+        'num_pages': page_obj.paginator.num_pages,
+        'count': page_obj.paginator.count,
+        'results': [
+            {
+                'slug': stats.group.slug,
+                'title': stats.group.title,
+                'posts_count': stats.posts_count,
+                'last_post_at': stats.last_post_at,
+                'top_authors': stats.top_authors_list,
+            }
+            for stats in page_obj
+        ],
+    })
+
+
+@shared_page(
+    settings.PAGE_CACHE_TIMEOUT, 'profile',
+    tags=lambda request, username: [f'author:{username}'],
+)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    post_user = author.posts.all()
-    paginator = Paginator(post_user, settings.POSTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    following = Follow.objects.filter(
-        user=request.user.is_authenticated,
-        author=author
+    summary = profiles.get_profile_summary(username)
+    author = summary.author
+    post_user = author.posts.cards()
+    paginator = EstimatedCountPaginator(
+        post_user, settings.POSTS_PER_PAGE,
+        estimate=lambda: summary.posts_count,
     )
+    page_obj = paginator.get_page(request.GET.get('page'))
     context = {
         'author': author,
+        'summary': summary,
         'page_obj': page_obj,
-        'following': following
     }
     return render(request, 'posts/profile.html', context)
 
 
 def post_detail(request, post):
-    post = get_object_or_404(Post, id=post)
+    response = render_post_detail(request, post)
+    if response.status_code == 200 and not is_warmup(request):
+        get_view_counter().hit(
+            int(post), request.user.pk or client_ip(request)
+        )
+    return response
+
+
+@shared_page(
+    settings.PAGE_CACHE_TIMEOUT, 'post',
+    tags=lambda request, post: [f'post:{post}'],
+)
+def render_post_detail(request, post):
+    post_id = post
+    post = Post.objects.select_related('author', 'group').filter(
+        id=post_id
+    ).first()
+    if post is None:
+        archived = get_object_or_404(ArchivedPost, id=post_id)
+        return render(request, 'posts/post_archived.html', {
+            'post': archived,
+            'comments': archived.comment_list,
+            'image_url': (
+                default_storage.url(archived.image) if archived.image else ''
+            ),
+        })
     posts = post.author.posts
     form = CommentForm(request.POST or None)
-    comments = post.comments.all()
+    comments = post.comments.select_related('author')
     context = {
         'post': post,
         'group': post.group,
         'posts': posts.count(),
         'form': form,
-        'comments': comments
+        'comments': comments,
     }
     return render(request, 'posts/post_detail.html', context)
 
 
 @login_required
+@throttle('post', methods=('POST',))
 def post_create(request):
     form = PostForm(
         request.POST or None,
@@ -79,6 +200,8 @@ def post_create(request):
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        if post.image:
+            make_thumbnails.delay(post.pk)
         return redirect('posts:profile', post.author)
     return render(request, 'posts/create_post.html', {'form': form})
 
@@ -95,6 +218,8 @@ def post_edit(request, post_id):
         return redirect('posts:post_detail', post_id)
     if form.is_valid():
         form.save(commit=False).save()
+        if 'image' in form.changed_data and post.image:
+            make_thumbnails.delay(post.pk)
         return redirect('posts:post_detail', post_id)
     return render(request, 'posts/create_post.html', {
         'form': form,
@@ -104,6 +229,7 @@ def post_edit(request, post_id):
 
 
 @login_required
+@throttle('comment', methods=('POST',))
 def add_comment(request, post_id):
     post = get_object_or_404(Post, id=post_id)
     form = CommentForm(request.POST or None)
@@ -111,16 +237,30 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        try:
+            save_comment(comment)
+        except CommentNotSaved:
+            response = HttpResponse(
+                'Комментарий не сохранён, попробуйте ещё раз.', status=503
+            )
+            response['Retry-After'] = '1'
+            return response
     return redirect('posts:post_detail', post_id)
 
 
 @login_required
+@personalized
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(posts, settings.POSTS_PER_PAGE)
+    posts = Post.objects.filter(
+        author__following__user=request.user
+    ).cards()
+    paginator = EstimatedCountPaginator(
+        posts, settings.POSTS_PER_PAGE,
+        estimate=lambda: counts.feed_count(request.user),
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    mark_read(request.user)
     context = {
         'page_obj': page_obj
     }
@@ -128,6 +268,7 @@ def follow_index(request):
 
 
 @login_required
+@throttle('follow')
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     user = request.user
@@ -150,3 +291,30 @@ def profile_unfollow(request, username):
     if request.method != 'POST':
         user_unfollow.delete()
     return redirect('posts:profile', author)
+
+
+def live_events(request):
+    """SSE-поток номеров новых постов главной, группы (?group=slug) или
+    ленты подписок (?feed=1), новых комментариев поста (?post=id)
+    и числа непрочитанных уведомлений (?notifications=1).
+    """
+    if request.GET.get('post', '').isdigit():
+        channels = [f'post:{request.GET["post"]}']
+    elif request.GET.get('group'):
+        channels = [f'group:{request.GET["group"]}']
+    elif request.GET.get('notifications'):
+        if not request.user.is_authenticated:
+            return HttpResponse(status=403)
+        channels = [live_channel(request.user.pk)]
+    elif request.GET.get('feed'):
+        if not request.user.is_authenticated:
+            return HttpResponse(status=403)
+        channels = [
+            f'author:{author_id}'
+            for author_id in Follow.objects.filter(
+                user=request.user
+            ).values_list('author_id', flat=True)
+        ]
+    else:
+        channels = ['index']
+    return sse_response(request, channels)
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.db.models import Count
+from django.urls import reverse
+
+from . import ranking
+from .models import GroupStats, Post, User
+
+
+def popular_urls(limit):
+    """Адреса страниц, которые чаще всего открывают после запуска:
+    первые страницы главной и её рейтинги, крупные группы, авторы
+    с наибольшим числом подписчиков и самые просматриваемые посты.
+    """
+    index = reverse('posts:index')
+    urls = [index]
+    urls += [
+        f'{index}?page={number}'
+        for number in range(2, settings.WARM_CACHE_INDEX_PAGES + 1)
+    ]
+    urls += [f'{index}?tab={kind}' for kind in ranking.KINDS]
+    urls += [
+        reverse('posts:group_list', args=[slug])
+        for slug in GroupStats.objects.order_by(
+            '-posts_count'
+        ).values_list('group__slug', flat=True)[:limit]
+    ]
+    urls += [
+        reverse('posts:profile', args=[username])
+        for username in User.objects.annotate(
+            followers=Count('following')
+        ).order_by('-followers', 'username').values_list(
+            'username', flat=True
+        )[:limit]
+    ]
+    urls += [
+        reverse('posts:post_detail', args=[post_id])
+        for post_id in Post.objects.order_by(
+            '-views', '-pub_date'
+        ).values_list('id', flat=True)[:limit]
+    ]
+    return urls
@@ -0,0 +1,14 @@
+// Подписка на SSE-поток новых постов или комментариев страницы.
+(function () {
+  var box = document.querySelector('[data-live]');
+  if (!box || !window.EventSource) {
+    return;
+  }
+  var count = 0;
+  var source = new EventSource(box.dataset.live);
+  source.addEventListener(box.dataset.liveEvent, function () {
+    count += 1;
+    box.querySelector('[data-live-count]').textContent = count;
+    box.classList.remove('d-none');
+  });
+})();
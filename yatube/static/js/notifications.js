@@ -0,0 +1,63 @@
+// Число новых постов в бейдже «Подписки». Если у бейджа есть адрес
+// SSE-потока, после первого запроса числа приходят из потока; иначе или
+// когда поток закрыт сервером, очередь опрашивается. Сервер отвечает на
+// опрос сразу и сообщает, через сколько секунд спросить снова; пока
+// вкладка скрыта, опрос откладывается.
+(function () {
+  var badge = document.querySelector('[data-notifications]');
+  if (!badge || !window.fetch) {
+    return;
+  }
+  var live = window.EventSource && badge.dataset.notificationsLive;
+  var version = '';
+  var interval = 30;
+
+  function show(data) {
+    if (data.unread !== undefined) {
+      badge.textContent = data.unread ? data.unread : '';
+    }
+    version = data.version;
+  }
+
+  function schedule() {
+    setTimeout(poll, interval * 1000);
+  }
+
+  function listen() {
+    var source = new EventSource(live);
+    source.addEventListener('notifications', function (event) {
+      show(JSON.parse(event.data));
+    });
+    source.onerror = function () {
+      if (source.readyState === EventSource.CLOSED) {
+        live = null;
+        schedule();
+      }
+    };
+  }
+
+  function poll() {
+    if (document.hidden && !live) {
+      schedule();
+      return;
+    }
+    fetch(badge.dataset.notifications + '?since=' + version, {
+      credentials: 'same-origin'
+    }).then(function (response) {
+      if (!response.ok) {
+        throw new Error(response.status);
+      }
+      return response.json();
+    }).then(function (data) {
+      show(data);
+      interval = data.interval || interval;
+      if (live) {
+        listen();
+      } else {
+        schedule();
+      }
+    }).catch(schedule);
+  }
+
+  poll();
+})();
@@ -0,0 +1,38 @@
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
+from django.utils.text import capfirst
+
+from posts.tasks import delete_user_later
+
+User = get_user_model()
+
+
+class SoftDeleteUserAdmin(UserAdmin):
+    """Удаление пользователя из админки сразу закрывает ему вход,
+    а посты, комментарии и подписки удаляются в фоне пачками.
+    """
+
+    def get_deleted_objects(self, objs, request):
+        """Страница подтверждения перечисляет только пользователей,
+        не обходя каскад их данных.
+        """
+        opts = self.model._meta
+        deleted = [f'{capfirst(opts.verbose_name)}: {obj}' for obj in objs]
+        perms_needed = (
+            set() if self.has_delete_permission(request)
+            else {opts.verbose_name}
+        )
+        model_count = {opts.verbose_name_plural: len(deleted)}
+        return deleted, model_count, perms_needed, []
+
+    def delete_model(self, request, obj):
+        delete_user_later(obj)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            delete_user_later(user)
+
+
+admin.site.unregister(User)
+admin.site.register(User, SoftDeleteUserAdmin)
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который держит пользователя сессии в кэше.
+
+    Запись сбрасывается при сохранении и удалении пользователя
+    (в том числе при смене пароля) и при выходе из аккаунта.
+    """
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user
@@ -0,0 +1,145 @@
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher, BasePasswordHasher, mask_hash,
+)
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext_noop as _
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def run_hashing(func, *args):
+    """Выполняет хеширование в ограниченном пуле потоков процесса.
+
+    Не больше PASSWORD_HASHING_WORKERS хешей считается одновременно,
+    остальные запросы ждут своей очереди и не отнимают CPU у воркера.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASHING_WORKERS,
+                    thread_name_prefix='password-hashing',
+                )
+    return _executor.submit(func, *args).result()
+
+
+class ScryptPasswordHasher(BasePasswordHasher):
+    """scrypt из стандартной библиотеки с параметрами из PASSWORD_SCRYPT."""
+    algorithm = 'scrypt'
+
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT['N']
+
+    @property
+    def block_size(self):
+        return settings.PASSWORD_SCRYPT['r']
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_SCRYPT['p']
+
+    def _derive(self, password, salt, work_factor, block_size, parallelism):
+        digest = run_hashing(
+            lambda: hashlib.scrypt(
+                password.encode(),
+                salt=salt.encode(),
+                n=work_factor,
+                r=block_size,
+                p=parallelism,
+                maxmem=work_factor * block_size * 256,
+                dklen=64,
+            )
+        )
+        return base64.b64encode(digest).decode('ascii')
+
+    def encode(self, password, salt):
+        assert password is not None
+        assert salt and '$' not in salt
+        work_factor = self.work_factor
+        block_size = self.block_size
+        parallelism = self.parallelism
+        hash = self._derive(
+            password, salt, work_factor, block_size, parallelism
+        )
+        return (
+            f'{self.algorithm}${work_factor}${salt}${block_size}'
+            f'${parallelism}${hash}'
+        )
+
+    def _decode(self, encoded):
+        algorithm, work_factor, salt, block_size, parallelism, hash = (
+            encoded.split('$', 5)
+        )
+        assert algorithm == self.algorithm
+        return {
+            'work_factor': int(work_factor),
+            'salt': salt,
+            'block_size': int(block_size),
+            'parallelism': int(parallelism),
+            'hash': hash,
+        }
+
+    def verify(self, password, encoded):
+        decoded = self._decode(encoded)
+        hash = self._derive(
+            password,
+            decoded['salt'],
+            decoded['work_factor'],
+            decoded['block_size'],
+            decoded['parallelism'],
+        )
+        return constant_time_compare(decoded['hash'], hash)
+
+    def safe_summary(self, encoded):
+        decoded = self._decode(encoded)
+        return OrderedDict([
+            (_('algorithm'), self.algorithm),
+            (_('work factor'), decoded['work_factor']),
+            (_('block size'), decoded['block_size']),
+            (_('parallelism'), decoded['parallelism']),
+            (_('salt'), mask_hash(decoded['salt'])),
+            (_('hash'), mask_hash(decoded['hash'])),
+        ])
+
+    def must_update(self, encoded):
+        decoded = self._decode(encoded)
+        return (
+            decoded['work_factor'] != self.work_factor
+            or decoded['block_size'] != self.block_size
+            or decoded['parallelism'] != self.parallelism
+        )
+
+    def harden_runtime(self, password, encoded):
+        pass
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2 с параметрами из PASSWORD_ARGON2, требует argon2-cffi."""
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2['time_cost']
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2['memory_cost']
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2['parallelism']
+
+    def encode(self, password, salt):
+        return run_hashing(super().encode, password, salt)
+
+    def verify(self, password, encoded):
+        return run_hashing(super().verify, password, encoded)
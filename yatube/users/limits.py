@@ -0,0 +1,30 @@
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+
+class LimitExceeded(Exception):
+    pass
+
+
+class ConcurrencyLimiter:
+    """Ограничивает число одновременных операций на один ключ."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._active = Counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, key):
+        with self._lock:
+            if self._active[key] >= self.limit:
+                raise LimitExceeded(key)
+            self._active[key] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active[key] -= 1
+                if not self._active[key]:
+                    del self._active[key]
@@ -0,0 +1,118 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import mail
+from core.models import Task
+from core.smtp_stub import SMTPStub
+from core.tasks import work
+
+from .backends import CachedModelBackend, user_cache_key
+from .hashers import ScryptPasswordHasher
+from .views import hashing_limiter
+
+User = get_user_model()
+
+
+class CachedAuthTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='Andrey')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_logged_in_request_skips_session_and_user_queries(self):
+        """Повторный запрос авторизованного пользователя
+        не обращается к базе за сессией и пользователем.
+        """
+        self.authorized_client.get('/about/author/')
+        with self.assertNumQueries(0):
+            response = self.authorized_client.get('/about/author/')
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_password_change_drops_cached_user(self):
+        """Смена пароля сбрасывает пользователя в кэше."""
+        backend = CachedModelBackend()
+        backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            backend.get_user(self.user.pk)
+        self.user.set_password('new-password-123')
+        self.user.save()
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+
+    def test_logout_drops_cached_user(self):
+        """Выход из аккаунта сбрасывает пользователя в кэше."""
+        self.authorized_client.get('/about/author/')
+        self.assertIsNotNone(cache.get(user_cache_key(self.user.pk)))
+        self.authorized_client.get('/auth/logout/')
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+
+
+class PasswordHashingTests(TestCase):
+    def test_scrypt_hasher_verifies_password(self):
+        """scrypt-хеш проверяется только верным паролем."""
+        hasher = ScryptPasswordHasher()
+        encoded = hasher.encode('secret-pass', hasher.salt())
+        self.assertTrue(encoded.startswith('scrypt$'))
+        self.assertTrue(hasher.verify('secret-pass', encoded))
+        self.assertFalse(hasher.verify('wrong-pass', encoded))
+
+    def test_login_rehashes_password_with_new_parameters(self):
+        """После смены параметров пароль перехешируется при входе."""
+        user = User.objects.create_user(
+            username='Andrey', password='secret-pass'
+        )
+        with override_settings(PASSWORD_SCRYPT={'N': 2 ** 10, 'r': 8, 'p': 1}):
+            self.assertTrue(ScryptPasswordHasher().must_update(user.password))
+            self.client.post(
+                '/auth/login/',
+                {'username': 'Andrey', 'password': 'secret-pass'}
+            )
+            user.refresh_from_db()
+            self.assertTrue(user.password.startswith('scrypt$1024$'))
+
+    def test_hashing_limit_per_ip(self):
+        """Лишние одновременные запросы с одного IP получают 429."""
+        with hashing_limiter.slot('127.0.0.1'):
+            with hashing_limiter.slot('127.0.0.1'):
+                response = self.client.post(
+                    '/auth/login/',
+                    {'username': 'Andrey', 'password': 'secret-pass'}
+                )
+        self.assertEqual(response.status_code, 429)
+
+
+@override_settings(
+    TASKS_EAGER=False,
+    EMAIL_BACKEND='core.mail.QueuedEmailBackend',
+    EMAIL_DELIVERY_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+    EMAIL_HOST='127.0.0.1',
+    EMAIL_USE_TLS=False,
+)
+class PasswordResetMailTests(TestCase):
+    def tearDown(self):
+        if mail._backend is not None:
+            mail._backend.close()
+        mail._backend = None
+
+    def test_reset_request_only_queues_mail(self):
+        """Запрос сброса пароля не ждёт SMTP: письмо уходит с воркером."""
+        User.objects.create_user(
+            username='Andrey', email='andrey@example.com',
+            password='Пароль-123',
+        )
+        with SMTPStub() as smtp, override_settings(EMAIL_PORT=smtp.port):
+            response = Client().post(
+                reverse('users:password_reset'),
+                {'email': 'andrey@example.com'},
+            )
+            self.assertEqual(response.status_code, 302)
+            self.assertEqual(smtp.connections, 0)
+            self.assertEqual(Task.objects.count(), 1)
+            work(burst=True)
+            self.assertEqual(len(smtp.messages), 1)
+            self.assertEqual(
+                smtp.messages[0].rcpt_tos, ['andrey@example.com']
+            )
+            self.assertIn(b'/auth/reset/', smtp.messages[0].data)
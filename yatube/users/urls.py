@@ -1,5 +1,5 @@
 from django.contrib.auth.views import (
-    LogoutView, LoginView,
+    LogoutView,
     PasswordResetView, PasswordResetDoneView,
     PasswordChangeView, PasswordChangeDoneView,
     PasswordResetConfirmView, PasswordResetCompleteView,
@@ -21,7 +21,7 @@ urlpatterns = [
     path('signup/', views.SignUp.as_view(), name='signup'),
     path(
         'login/',
-        LoginView.as_view(template_name='users/login.html'),
+        views.LoginView.as_view(template_name='users/login.html'),
         name='login'
     ),
     path(
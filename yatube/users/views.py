@@ -1,11 +1,36 @@
+from django.conf import settings
+from django.contrib.auth import views as auth_views
+from django.http import HttpResponse
 from django.views.generic import CreateView
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
+
+from core.throttling import client_ip, throttle
 from .forms import CreationForm
+from .limits import ConcurrencyLimiter, LimitExceeded
 
 app_name = 'posts'
 
+hashing_limiter = ConcurrencyLimiter(settings.PASSWORD_HASHING_PER_IP)
+
+
+class HashingLimitMixin:
+    """Не даёт одному IP занять все потоки хеширования паролей."""
+
+    def post(self, request, *args, **kwargs):
+        try:
+            with hashing_limiter.slot(client_ip(request)):
+                return super().post(request, *args, **kwargs)
+        except LimitExceeded:
+            return HttpResponse(status=429)
 
-class SignUp(CreateView):
+
+@method_decorator(throttle('signup', methods=('POST',)), name='dispatch')
+class SignUp(HashingLimitMixin, CreateView):
     form_class = CreationForm
     success_url = reverse_lazy('posts:index')
     template_name = 'users/signup.html'
+
+
+class LoginView(HashingLimitMixin, auth_views.LoginView):
+    pass
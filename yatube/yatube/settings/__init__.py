@@ -0,0 +1,26 @@
+"""Настройки выбираются переменной окружения DJANGO_ENV: dev (по
+умолчанию) или prod. Общая часть лежит в base.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+
+DJANGO_ENV = os.getenv('DJANGO_ENV', 'dev')
+
+if DJANGO_ENV == 'dev':
+    from .dev import *  # noqa: F401,F403
+elif DJANGO_ENV == 'prod':
+    from .prod import *  # noqa: F401,F403
+    from .checks import check_production
+
+    errors = check_production(globals())
+    if errors:
+        raise ImproperlyConfigured(
+            'Боевой профиль не запущен: ' + '; '.join(errors)
+        )
+else:
+    raise ImproperlyConfigured(
+        f'Неизвестный DJANGO_ENV={DJANGO_ENV!r}, ожидается dev или prod'
+    )
@@ -0,0 +1,354 @@
+"""
+Django settings for yatube project shared by all profiles.
+
+Generated by 'django-admin startproject' using Django 2.2.19.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/2.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/2.2/ref/settings/
+"""
+
+import os
+from dotenv import load_dotenv
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)
+)))
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+load_dotenv()
+SECRET_KEY = os.getenv('SECRET_KEY')
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+]
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin.apps.SimpleAdminConfig',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'posts.apps.PostsConfig',
+    'users.apps.UsersConfig',
+    'core.apps.CoreConfig',
+    'about.apps.AboutConfig',
+    'notifications.apps.NotificationsConfig',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'core.middleware.CompressionMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.throttling.ThrottleMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+
+# Static {% include %} tags are inlined into the including template when
+# it is compiled; the prod profile also caches compiled templates.
+TEMPLATE_LOADERS = [
+    'core.template_loaders.FilesystemLoader',
+    'core.template_loaders.AppDirectoriesLoader',
+]
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+                'core.context_processors.live.live',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+    }
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Password hashing
+# TunedArgon2PasswordHasher can be moved to the top once argon2-cffi
+# is installed; existing hashes are upgraded on the next login.
+
+PASSWORD_HASHERS = [
+    'users.hashers.ScryptPasswordHasher',
+    'users.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+PASSWORD_SCRYPT = {'N': 2 ** 14, 'r': 8, 'p': 1}
+
+PASSWORD_ARGON2 = {'time_cost': 2, 'memory_cost': 102400, 'parallelism': 8}
+
+PASSWORD_HASHING_WORKERS = 2
+
+PASSWORD_HASHING_PER_IP = 2
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+
+STATIC_URL = '/static/'
+STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Sessions and authentication
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+AUTHENTICATION_BACKENDS = ['users.backends.CachedModelBackend']
+
+USER_CACHE_TIMEOUT = 60
+
+# Redirects
+
+LOGIN_URL = 'users:login'
+LOGIN_REDIRECT_URL = 'posts:index'
+
+
+# Mail is queued as tasks and sent by the task worker through
+# EMAIL_DELIVERY_BACKEND, EMAIL_BATCH_SIZE messages per task.
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
+EMAIL_DELIVERY_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BATCH_SIZE = 50
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+# CONSTANTS
+
+POSTS_PER_PAGE = int('10', base=10)
+
+# Feed cards show a stored excerpt: the first paragraphs of the post,
+# at most POST_EXCERPT_LENGTH characters.
+POST_EXCERPT_LENGTH = 500
+POST_EXCERPT_PARAGRAPHS = 3
+
+# Post lists smaller than this are counted exactly, larger ones use
+# the maintained per-scope counts.
+PAGINATOR_EXACT_COUNT_THRESHOLD = 1000
+
+GROUPS_PER_PAGE = 20
+
+PROFILE_CACHE_TIMEOUT = 5 * 60
+
+# Shared page renderings live until a tag bump or this many seconds.
+PAGE_CACHE_TIMEOUT = 10 * 60
+
+GROUP_TOP_AUTHORS = 3
+
+# Comment write batching: comments from concurrent requests are saved
+# together in one transaction every COMMENT_BATCH_INTERVAL seconds.
+COMMENT_WRITE_BATCHING = False
+COMMENT_BATCH_INTERVAL = 0.005
+COMMENT_BATCH_SIZE = 100
+COMMENT_BATCH_TIMEOUT = 5
+
+# Hot and trending tabs: event weights and score half-life in seconds.
+RANKING_WEIGHTS = {'post': 1, 'comment': 2, 'view': 0.1}
+RANKING_HALF_LIFE = {'hot': 24 * 60 * 60, 'trending': 3 * 60 * 60}
+RANKING_TOP_K = 200
+RANKING_CACHE_TIMEOUT = 60
+
+# Post views are buffered in memory and written every
+# VIEW_COUNTER_FLUSH_INTERVAL seconds.
+VIEW_COUNTER_FLUSH_INTERVAL = 10
+VIEW_COUNTER_JOURNAL_DIR = os.path.join(BASE_DIR, 'view_counts')
+VIEW_COUNTER_UNIQUE = False
+
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+# Cache pages
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Response compression: bodies shorter than COMPRESSION_MIN_SIZE bytes
+# are sent as is, brotli is used when the package is installed.
+COMPRESSION_MIN_SIZE = 200
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_LEVEL = 5
+COMPRESSION_CACHE_TIMEOUT = 10 * 60
+
+# Stampede protection: expired entries are kept CACHE_STALE_TIMEOUT
+# seconds longer and served while one request recomputes them.
+CACHE_STALE_TIMEOUT = 60
+CACHE_LOCK_TIMEOUT = 10
+CACHE_LOCK_WAIT = 5
+CACHE_EARLY_BETA = 1.0
+
+# Startup: admin modules are discovered by the URLconf, not by
+# django.setup(). yatube.wsgi preloads these templates and modules
+# before workers fork; `manage.py importtime --check` fails when a cold
+# start takes longer than STARTUP_TIME_TARGET milliseconds.
+STARTUP_PRELOAD_TEMPLATES = [
+    'posts/index.html',
+    'posts/group_list.html',
+    'posts/profile.html',
+    'posts/post_detail.html',
+]
+STARTUP_PRELOAD_MODULES = [
+    'PIL.Image',
+    'sorl.thumbnail.engines.pil_engine',
+]
+STARTUP_TIME_TARGET = 1000
+# Fill the cache before forking (STARTUP_WARM_CACHE) or with
+# `manage.py warm_cache` after a deploy.
+STARTUP_WARM_CACHE = False
+
+# Cache warm-up: index pages and the top WARM_CACHE_LIMIT groups,
+# authors and posts, fetched by WARM_CACHE_CONCURRENCY threads.
+WARM_CACHE_INDEX_PAGES = 3
+WARM_CACHE_LIMIT = 10
+WARM_CACHE_CONCURRENCY = 4
+
+# Rate limits per user (or IP for guests) as "count/period", period is
+# s, m, h or d. "writes" applies to every POST, PUT, PATCH and DELETE.
+# The "shared" backend keeps buckets in memory shared by forked workers.
+THROTTLE_RATES = {
+    'writes': '60/m',
+    'post': '10/m',
+    'comment': '20/m',
+    'follow': '30/m',
+    'signup': '5/h',
+}
+THROTTLE_BACKEND = 'local'
+THROTTLE_MAX_KEYS = 100000
+THROTTLE_SHARED_SLOTS = 65536
+# Addresses or networks of reverse proxies whose X-Forwarded-For is
+# trusted to find the client IP for guest limits.
+TRUSTED_PROXIES = []
+
+# Task queue: core.models.Task rows run by `manage.py run_tasks`.
+# Failed tasks are retried after TASK_RETRY_DELAY * 2 ** (attempt - 1)
+# seconds. A worker renews the lock on its tasks every
+# TASK_HEARTBEAT_INTERVAL seconds; tasks not renewed for
+# TASK_LOCK_TIMEOUT seconds are handed to another worker, or failed if
+# they have no attempts left. On database errors a worker backs off for
+# up to TASK_ERROR_BACKOFF seconds. With TASKS_EAGER tasks run inline.
+TASKS_EAGER = False
+TASK_WORKERS = 2
+TASK_BATCH_SIZE = 10
+TASK_POLL_INTERVAL = 1
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_DELAY = 10
+TASK_LOCK_TIMEOUT = 5 * 60
+TASK_HEARTBEAT_INTERVAL = 60
+TASK_ERROR_BACKOFF = 60
+
+# Notifications: followers are added to the queues NOTIFICATIONS_BATCH_SIZE
+# at a time. Unread counts are pushed over the live stream when
+# LIVE_EVENTS_URL is set; otherwise pages poll the cached queue version
+# every NOTIFICATIONS_POLL_INTERVAL seconds and each poll returns at once.
+NOTIFICATIONS_BATCH_SIZE = 500
+NOTIFICATIONS_POLL_INTERVAL = 30
+
+# Live updates over Server-Sent Events. Pages subscribe only when
+# LIVE_EVENTS_URL points at /live/ served by a separate gevent instance:
+# each stream holds a worker, so sync workers must not serve it.
+# The "cache" backend shares events between processes through the cache
+# (each process reads the log every EVENTS_RELAY_INTERVAL seconds and
+# waits up to EVENTS_RELAY_GRACE seconds for an entry still being
+# written); "local" delivers them within a process. Streams send a
+# heartbeat every EVENTS_HEARTBEAT seconds and are closed after
+# EVENTS_STREAM_TIMEOUT seconds for the browser to reconnect.
+LIVE_EVENTS_URL = ''
+EVENTS_BACKEND = 'local'
+EVENTS_HISTORY = 1000
+EVENTS_QUEUE_SIZE = 100
+EVENTS_RELAY_INTERVAL = 0.5
+EVENTS_RELAY_GRACE = 5
+EVENTS_LOG_TIMEOUT = 5 * 60
+EVENTS_HEARTBEAT = 15
+EVENTS_STREAM_TIMEOUT = 5 * 60
+EVENTS_RETRY_MS = 3000
+
+# Archive: posts older than ARCHIVE_AFTER_DAYS are moved by the
+# archive_posts command, ARCHIVE_BATCH_SIZE per transaction, into the
+# ArchivedPost table on ARCHIVE_DATABASE (may be a separate database).
+# Deleted users are purged in the background USER_PURGE_BATCH_SIZE rows
+# at a time.
+ARCHIVE_AFTER_DAYS = 365
+ARCHIVE_BATCH_SIZE = 500
+ARCHIVE_DATABASE = 'default'
+USER_PURGE_BATCH_SIZE = 500
+DATABASE_ROUTERS = ['posts.routers.ArchiveRouter']
@@ -0,0 +1,18 @@
+def check_production(settings):
+    """Ошибки, с которыми боевой профиль не запускается."""
+    errors = []
+    if settings['DEBUG']:
+        errors.append('DEBUG включён')
+    if not settings['SECRET_KEY']:
+        errors.append('не задан SECRET_KEY')
+    if not settings['ALLOWED_HOSTS']:
+        errors.append('не задан DJANGO_ALLOWED_HOSTS')
+    if 'locmem' in settings['CACHES']['default']['BACKEND']:
+        errors.append('кэш в памяти процесса не общий для воркеров')
+    if settings['DATABASES']['default']['ENGINE'].endswith('sqlite3'):
+        errors.append('SQLite не годится для нескольких воркеров')
+    if settings['EVENTS_BACKEND'] != 'cache':
+        errors.append('события /live/ не доходят до других процессов')
+    if settings['TEMPLATES'][0]['OPTIONS'].get('debug'):
+        errors.append('включена отладка шаблонов')
+    return errors
@@ -0,0 +1,6 @@
+"""Локальная разработка: отладка, SQLite и кэш в памяти процесса."""
+
+DEBUG = True
+
+# Deferred tasks run inline, no run_tasks worker is needed.
+TASKS_EAGER = True
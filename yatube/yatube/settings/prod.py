@@ -0,0 +1,65 @@
+"""Боевой профиль: параметры БД, кэша и хостов берутся из окружения."""
+import os
+from copy import deepcopy
+
+from .base import TEMPLATE_LOADERS, TEMPLATES
+
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.getenv('DJANGO_ALLOWED_HOSTS', '').split(',')
+    if host.strip()
+]
+
+TEMPLATES = deepcopy(TEMPLATES)
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+]
+
+DATABASES = {
+    'default': {
+        'ENGINE': os.getenv('DB_ENGINE', 'django.db.backends.postgresql'),
+        'NAME': os.getenv('DB_NAME', 'yatube'),
+        'USER': os.getenv('DB_USER', ''),
+        'PASSWORD': os.getenv('DB_PASSWORD', ''),
+        'HOST': os.getenv('DB_HOST', ''),
+        'PORT': os.getenv('DB_PORT', ''),
+        # Connections are kept open between requests of a worker.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+    }
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.memcached.MemcachedCache',
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', '127.0.0.1:11211'),
+    }
+}
+
+TRUSTED_PROXIES = [
+    proxy.strip()
+    for proxy in os.getenv('TRUSTED_PROXIES', '127.0.0.1,::1').split(',')
+    if proxy.strip()
+]
+
+# /live/ of the gevent instance, routed by the proxy, e.g. '/live/'.
+LIVE_EVENTS_URL = os.getenv('LIVE_EVENTS_URL', '')
+
+# Several worker processes (and the separate /live/ instance) share
+# events through the cache and token buckets through shared memory.
+EVENTS_BACKEND = 'cache'
+THROTTLE_BACKEND = 'shared'
+
+EMAIL_DELIVERY_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS') == '1'
+
+SESSION_COOKIE_SECURE = True
+CSRF_COOKIE_SECURE = True
@@ -18,17 +18,26 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core.views import cache_stats
+
 app_name = 'posts'
 app_name = 'users'
 app_name = 'about'
 app_name = 'core'
 
+admin.autodiscover()
+
 urlpatterns = [
     path('', include('posts.urls', namespace='posts')),
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls', namespace='users')),
     path('about/', include('about.urls', namespace='about')),
+    path(
+        'notifications/',
+        include('notifications.urls', namespace='notifications'),
+    ),
     path('auth/', include('django.contrib.auth.urls')),
+    path('cache/stats/', cache_stats, name='cache_stats'),
 ]
 
 handler404 = 'core.views.page_not_found'
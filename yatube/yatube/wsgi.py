@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+if os.environ.get('WSGI_PRELOAD', '1') == '1':
+    from core.startup import preload
+    preload()